@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import secrets
+import time
+from collections import OrderedDict
+
+class JobRejected(Exception):
+    pass
+
+class FakeModel:
+    """Deterministic stand-in for a real model, used in tests and local development."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def generate(self, kind: str, prompt: str, current_data: dict, api_key: str) -> dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        seed = int(hashlib.sha256(f"{prompt}:{current_data.get('title', '')}".encode()).hexdigest(), 16)
+        if kind == "image":
+            return {"imageUrl": f"https://picsum.photos/800/400?random={seed % 10000}", "prompt": prompt}
+        if prompt == 'generate_title':
+            return {"title": "AI-Generated: The Future of Digital Innovation"}
+        if prompt == 'generate_category':
+            return {"category": "technology"}
+        if prompt == 'generate_tags':
+            return {"tags": "ai, innovation, digital, future, technology"}
+        if prompt == 'generate_content':
+            return {
+                "content": "Digital innovation is transforming how we work, communicate, and live. From artificial intelligence to blockchain technology, we're witnessing unprecedented changes that will shape the next decade.\n\nKey trends include:\n- AI-powered automation\n- Sustainable technology solutions\n- Enhanced user experiences\n- Data-driven decision making\n\nThese developments present both opportunities and challenges for businesses and individuals alike."
+            }
+        if prompt == 'generate_image':
+            return {"image": f"https://picsum.photos/400/200?random={seed % 1000}"}
+        return {"message": "AI generation completed"}
+
+def make_model(backend: str, latency: float = 0.0):
+    if backend == "fake":
+        return FakeModel(latency)
+    raise ValueError(f"Unknown AI backend: {backend}")
+
+def cache_key(kind: str, prompt: str, current_data: dict) -> str:
+    data_hash = hashlib.sha256(json.dumps(current_data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+    return hashlib.sha256(f"{kind}\0{prompt}\0{data_hash}".encode()).hexdigest()
+
+class Job:
+    def __init__(self, user_id: str, kind: str, key: str):
+        self.id = secrets.token_urlsafe(12)
+        self.user_id = user_id
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.cached = False
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def finish(self, status: str, result: dict = None, error: str = None):
+        self.status, self.result, self.error = status, result, error
+        self.finished_at = time.time()
+        self.done.set()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.done.is_set()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id, "kind": self.kind, "status": self.status, "cached": self.cached,
+            "result": self.result, "error": self.error
+        }
+
+class AIJobQueue:
+    """Runs generation jobs off the request path.
+
+    At most `workers` model calls run at once and each user may have
+    `per_user` jobs queued or running. Results are cached by prompt plus a
+    hash of currentData, and identical in-flight requests share one job.
+    Finished jobs are kept for job_ttl seconds so clients can poll them.
+    """
+
+    def __init__(self, model, workers: int = 4, per_user: int = 2, max_queued: int = 100,
+                 timeout: float = 60.0, cache_size: int = 1000, job_ttl: float = 600.0):
+        self.model = model
+        self.per_user = per_user
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self.cache = OrderedDict()
+        self._in_flight = {}
+        self._active = {}
+        self._slots = asyncio.Semaphore(workers)
+
+    def submit(self, user_id: str, kind: str, prompt: str, current_data: dict, api_key: str) -> Job:
+        self._expire()
+        key = cache_key(kind, prompt, current_data)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            job = Job(user_id, kind, key)
+            job.cached = True
+            job.finish("done", self.cache[key])
+            self.jobs[job.id] = job
+            return job
+        if key in self._in_flight and self._in_flight[key].user_id == user_id:
+            return self._in_flight[key]
+        if self._active.get(user_id, 0) >= self.per_user:
+            raise JobRejected(f"At most {self.per_user} AI jobs per user may run at once")
+        if len(self._in_flight) >= self.max_queued:
+            raise JobRejected("AI job queue is full")
+
+        job = Job(user_id, kind, key)
+        self.jobs[job.id] = job
+        self._in_flight[key] = job
+        self._active[user_id] = self._active.get(user_id, 0) + 1
+        asyncio.create_task(self._run(job, prompt, current_data, api_key))
+        return job
+
+    async def _run(self, job: Job, prompt: str, current_data: dict, api_key: str):
+        try:
+            async with self._slots:
+                job.status = "running"
+                result = await asyncio.wait_for(
+                    self.model.generate(job.kind, prompt, current_data, api_key), self.timeout
+                )
+            self.cache[job.key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            job.finish("done", result)
+        except asyncio.TimeoutError:
+            job.finish("failed", error=f"Timed out after {self.timeout:g}s")
+        except Exception as e:
+            job.finish("failed", error=str(e))
+        finally:
+            # Another user's job for the same key may have replaced this one
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+            self._active[job.user_id] -= 1
+            if not self._active[job.user_id]:
+                del self._active[job.user_id]
+
+    def get(self, job_id: str, user_id: str):
+        job = self.jobs.get(job_id)
+        return job if job and job.user_id == user_id else None
+
+    def _expire(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j.id for j in self.jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self.jobs[job_id]
@@ -0,0 +1,139 @@
+"""Post view tracking.
+
+Beacon hits are appended to an in-memory buffer and COPYed into the
+post_views event table in batches. rollup() folds newly ingested events
+into the hourly and daily tables, which are all the admin endpoint reads.
+Run this module to roll up from cron:
+
+    python analytics.py
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, update
+from sqlalchemy.dialects.postgresql import insert
+from database import AsyncSessionLocal, async_engine, Post, PostView, PostViewsHourly, PostViewsDaily, RollupState
+from metrics import ANALYTICS_VIEWS_DROPPED
+
+logger = logging.getLogger("foxxtalk.analytics")
+
+EPOCH = datetime(1970, 1, 1)
+
+class ViewRecorder:
+    def __init__(self, flush_interval: float = 2.0, rollup_interval: float = 60.0, rollup_lag: float = 30.0,
+                 max_buffer: int = 100_000, retention_days: int = 90):
+        self.flush_interval = flush_interval
+        self.rollup_interval = rollup_interval
+        # Events are rolled up once they are older than this, so in-flight COPYs have committed
+        self.rollup_lag = rollup_lag
+        self.max_buffer = max_buffer
+        self.retention_days = retention_days
+        self.buffer = []
+        self._task = None
+        self._rolled_at = 0.0
+
+    def record(self, post_id: int):
+        if len(self.buffer) >= self.max_buffer:
+            ANALYTICS_VIEWS_DROPPED.inc()
+            return
+        self.buffer.append((post_id, datetime.utcnow()))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if time.monotonic() - self._rolled_at >= self.rollup_interval:
+                    self._rolled_at = time.monotonic()
+                    await rollup(self.rollup_lag, self.retention_days)
+            except Exception:
+                logger.exception("View analytics flush failed")
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        try:
+            async with async_engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    PostView.__tablename__, records=batch, columns=["post_id", "viewed_at"]
+                )
+        except BaseException:
+            # Put the batch back for the next flush; views recorded since then count against the same cap
+            self.buffer = batch + self.buffer
+            if len(self.buffer) > self.max_buffer:
+                ANALYTICS_VIEWS_DROPPED.inc(len(self.buffer) - self.max_buffer)
+                del self.buffer[self.max_buffer:]
+            raise
+
+    async def close(self):
+        # Shutdown: stop the flush loop and write what is buffered, without letting a database error escape
+        if self._task:
+            self._task.cancel()
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final view analytics flush failed; %d views lost", len(self.buffer))
+
+def rollup_insert(table, column, bucket, lower, upper):
+    counts = (
+        select(PostView.post_id, bucket, func.count())
+        .join(Post, Post.id == PostView.post_id)
+        .where(PostView.ingested_at >= lower, PostView.ingested_at < upper)
+        .group_by(PostView.post_id, bucket)
+    )
+    stmt = insert(table).from_select([table.post_id, column, table.views], counts)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.post_id, column],
+        set_={"views": table.views + stmt.excluded.views}
+    )
+
+async def rollup(lag: float = 30.0, retention_days: int = 90):
+    # Incremental: only events ingested since the last pass are aggregated.
+    # The state row lock keeps concurrent workers from counting a window twice.
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(RollupState).values(name="post_views", rolled_up_to=EPOCH).on_conflict_do_nothing())
+        lower = await db.scalar(select(RollupState.rolled_up_to).where(RollupState.name == "post_views").with_for_update())
+        upper = await db.scalar(select(func.timezone("utc", func.now()) - timedelta(seconds=lag)))
+        if upper <= lower:
+            return
+        await db.execute(rollup_insert(PostViewsHourly, PostViewsHourly.hour, func.date_trunc("hour", PostView.viewed_at), lower, upper))
+        await db.execute(rollup_insert(PostViewsDaily, PostViewsDaily.day, func.date(PostView.viewed_at), lower, upper))
+        await db.execute(update(RollupState).where(RollupState.name == "post_views").values(rolled_up_to=upper))
+        if retention_days:
+            await db.execute(PostView.__table__.delete().where(PostView.ingested_at < lower - timedelta(days=retention_days)))
+        await db.commit()
+
+async def view_summary(db, days: int = 30, top: int = 10) -> dict:
+    today = datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+    total = await db.scalar(select(func.coalesce(func.sum(PostViewsDaily.views), 0)))
+    monthly = await db.scalar(
+        select(func.coalesce(func.sum(PostViewsDaily.views), 0)).where(PostViewsDaily.day >= today.replace(day=1))
+    )
+    daily = await db.execute(
+        select(PostViewsDaily.day, func.sum(PostViewsDaily.views))
+        .where(PostViewsDaily.day >= since).group_by(PostViewsDaily.day).order_by(PostViewsDaily.day)
+    )
+    views = func.sum(PostViewsDaily.views).label("views")
+    top_posts = await db.execute(
+        select(Post.id, Post.title, views)
+        .select_from(PostViewsDaily).join(Post, Post.id == PostViewsDaily.post_id)
+        .where(PostViewsDaily.day >= since)
+        .group_by(Post.id, Post.title).order_by(views.desc()).limit(top)
+    )
+    return {
+        "totalViews": int(total),
+        "monthlyViews": int(monthly),
+        "dailyViews": [{"day": day.isoformat(), "views": int(count)} for day, count in daily],
+        "topPosts": [{"id": post_id, "title": title, "views": int(count)} for post_id, title, count in top_posts],
+    }
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rollup())
+    logger.info("View rollups refreshed")
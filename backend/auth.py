@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from database import AsyncSessionLocal, RevokedToken
+
+# The value docker-compose and main.py used to ship; anyone can sign tokens with it
+PLACEHOLDER_SECRET_KEY = "your-secret-key-change-in-production"
+
+class InvalidToken(Exception):
+    pass
+
+def check_secret_key(secret_key: str):
+    if not secret_key or secret_key == PLACEHOLDER_SECRET_KEY:
+        raise RuntimeError("SECRET_KEY must be set to a private random value, e.g. python -c 'import secrets; print(secrets.token_urlsafe(32))'")
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def sign_value(secret_key: str, value: str) -> str:
+    signature = hmac.new(secret_key.encode(), value.encode(), hashlib.sha256).digest()
+    return f"{value}.{_b64encode(signature)}"
+
+def unsign_value(secret_key: str, signed: str) -> Optional[str]:
+    # The value if the signature matches, otherwise None
+    value, _, signature = (signed or "").rpartition(".")
+    expected = hmac.new(secret_key.encode(), value.encode(), hashlib.sha256).digest()
+    try:
+        return value if value and hmac.compare_digest(expected, _b64decode(signature)) else None
+    except ValueError:
+        return None
+
+def issue_token(secret_key: str, user_id: str, email: str, ttl: int) -> str:
+    payload = {"sub": user_id, "email": email, "exp": int(time.time()) + ttl, "jti": secrets.token_urlsafe(12)}
+    return sign_value(secret_key, _b64encode(json.dumps(payload, separators=(",", ":")).encode()))
+
+def decode_token(secret_key: str, token: str) -> dict:
+    try:
+        body, signature = token.split(".")
+        expected = hmac.new(secret_key.encode(), body.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise InvalidToken("Bad signature")
+        payload = json.loads(_b64decode(body))
+    except (ValueError, TypeError):
+        raise InvalidToken("Malformed token")
+    if payload.get("exp", 0) < time.time():
+        raise InvalidToken("Token expired")
+    return payload
+
+class MemoryRevocationStore:
+    """Single-process revocation list, used in tests and local development."""
+
+    def __init__(self):
+        self._revoked = {}
+
+    async def revoke(self, jti: str, expires_at: int):
+        self._revoked[jti] = expires_at
+
+    async def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+class PostgresRevocationStore:
+    """Revocation list shared by every worker through the revoked_tokens table.
+
+    Each worker keeps the unexpired jtis in memory and reloads them at most
+    every refresh_interval seconds, so authenticated requests normally make
+    no database round trip. A logout is visible immediately on the worker
+    that handled it and within refresh_interval everywhere else.
+    """
+
+    def __init__(self, refresh_interval: float = 5.0):
+        self.refresh_interval = refresh_interval
+        self._revoked = set()
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    async def revoke(self, jti: str, expires_at: int):
+        self._revoked.add(jti)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert(RevokedToken)
+                .values(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at))
+                .on_conflict_do_nothing()
+            )
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+            await db.commit()
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_interval:
+            await self._refresh()
+        return jti in self._revoked
+
+    async def _refresh(self):
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            async with AsyncSessionLocal() as db:
+                rows = await db.scalars(select(RevokedToken.jti).where(RevokedToken.expires_at >= datetime.utcnow()))
+                self._revoked = set(rows)
+            self._loaded_at = time.monotonic()
+
+def make_revocation_store(backend: str, refresh_interval: float):
+    if backend == "memory":
+        return MemoryRevocationStore()
+    if backend == "postgres":
+        return PostgresRevocationStore(refresh_interval)
+    raise ValueError(f"Unknown token revocation backend: {backend}")
@@ -0,0 +1,98 @@
+"""Fill the derived post columns for rows written before they existed.
+
+Walks posts by id and hands each batch to a process pool for rendering
+(rendering.derive_fields), keeping up to --workers batches in flight. Each
+batch is written in its own transaction, so an interrupted run picks up
+where it stopped. updated_at is left alone; the "posts" and "landing"
+versions are bumped so cached listings pick up the new fields, and
+"post-render" so post pages get a new Last-Modified (their ETag follows
+change_seq, which the write moves).
+
+    python backfill.py                   # rows that have no derived fields yet
+    python backfill.py --all             # re-render every post, e.g. after a renderer change
+    python backfill.py --workers 8 --batch-size 1000
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select, update, bindparam
+from cache import bump_version
+from database import AsyncSessionLocal, Post
+from rendering import derive_batch
+
+BACKFILL_BATCH_SIZE = 500
+
+# The SET clause comes from each parameter set's keys. updated_at is set to itself because
+# its onupdate would otherwise mark every post as edited.
+UPDATE_DERIVED = (
+    update(Post.__table__)
+    .where(Post.__table__.c.id == bindparam("post_id"))
+    .values(updated_at=Post.__table__.c.updated_at)
+)
+
+async def write_batch(pool, rows) -> list:
+    derived = await asyncio.get_running_loop().run_in_executor(pool, derive_batch, [content for _, content in rows])
+    async with AsyncSessionLocal() as db:
+        await db.execute(UPDATE_DERIVED, [{"post_id": post_id, **fields} for (post_id, _), fields in zip(rows, derived)])
+        await bump_version(db, "posts")
+        await bump_version(db, "landing")
+        # Moves Last-Modified on post pages, since updated_at stays put
+        await bump_version(db, "post-render")
+        await db.commit()
+    return [post_id for post_id, _ in rows]
+
+async def backfill(everything: bool = False, batch_size: int = BACKFILL_BATCH_SIZE, workers: int = None, on_batch=None) -> int:
+    """Render and store derived fields; returns the number of posts written.
+
+    on_batch(ids) is called after each batch commits.
+    """
+    workers = workers or os.cpu_count() or 1
+    written, last_id, in_flight = 0, 0, set()
+
+    def collect(tasks):
+        nonlocal written
+        for task in tasks:
+            ids = task.result()
+            written += len(ids)
+            if on_batch:
+                on_batch(ids)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                query = select(Post.id, Post.content).where(Post.id > last_id)
+                if not everything:
+                    query = query.where(Post.content_html.is_(None))
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(query.order_by(Post.id).limit(batch_size))).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                if len(in_flight) >= workers:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(asyncio.create_task(write_batch(pool, rows)))
+            if in_flight:
+                collect((await asyncio.wait(in_flight))[0])
+        finally:
+            for task in in_flight:
+                task.cancel()
+    return written
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--all", action="store_true", help="re-render posts that already have derived fields")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="batches rendered and written at once")
+    args = parser.parse_args(argv)
+
+    from main import publisher
+    start = time.perf_counter()
+    written = await backfill(args.all, args.batch_size, args.workers, lambda ids: publisher.schedule_many("post", ids))
+    await publisher.wait()
+    print(f"Derived fields written for {written} posts in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
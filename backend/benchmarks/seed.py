@@ -0,0 +1,76 @@
+"""Scratch database helpers shared by the benchmark scripts.
+
+create_scratch_database() makes an empty database next to DATABASE_URL and
+migrate_and_seed() brings it to head and fills it with synthetic posts and
+pages. Posts are a minute apart, every tenth one is a draft and each has
+two tags, so listings, search and tag filters all have realistic work.
+Derived fields are filled by the backfill, as for any existing database.
+"""
+import os
+import subprocess
+import sys
+from sqlalchemy import create_engine, text
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED = [
+    """
+    INSERT INTO posts (title, content, category, tags, image, author, author_image, published, user_id, created_at, updated_at)
+    SELECT 'Post ' || g,
+           repeat('lorem ipsum dolor sit amet ', 40) || ' word' || (g % 1000),
+           (ARRAY['general', 'tech', 'media', 'creative', 'business'])[1 + g % 5],
+           'tag' || (g % 50) || ', tag' || (g % 7),
+           '', 'Seeder', '', g % 10 <> 0, 'admin-001',
+           timestamp '2024-01-01' + g * interval '1 minute',
+           timestamp '2024-01-01' + g * interval '1 minute'
+    FROM generate_series(1, :rows) AS g
+    """,
+    """
+    INSERT INTO post_tags (post_id, tag)
+    SELECT id, 'tag' || (id % 50) FROM posts
+    UNION SELECT id, 'tag' || (id % 7) FROM posts
+    """,
+    """
+    INSERT INTO pages (title, slug, content, meta_description, published, user_id, created_at, updated_at)
+    SELECT 'Page ' || g, 'page-' || g, 'Body', '', true, 'admin-001', now(), now()
+    FROM generate_series(1, :pages) AS g
+    """,
+    "INSERT INTO landing_pages (data, created_at, updated_at) VALUES ('{\"hero\": {}, \"featuredPosts\": {\"count\": 3}}', now(), now())",
+    "INSERT INTO global_settings (data, created_at, updated_at) VALUES ('{}', now(), now())",
+    "INSERT INTO blog_settings (data, created_at, updated_at) VALUES ('{}', now(), now())",
+    "INSERT INTO resource_versions (name, version, updated_at) VALUES ('posts', 1, now())",
+]
+
+def create_scratch_database(url, suffix: str):
+    scratch = url.set(database=f"{url.database}_{suffix}")
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{scratch.database}" WITH (FORCE)'))
+        conn.execute(text(f'CREATE DATABASE "{scratch.database}"'))
+    admin.dispose()
+    return scratch
+
+def drop_scratch_database(url, scratch):
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{scratch.database}" WITH (FORCE)'))
+    admin.dispose()
+
+def migrate_and_seed(rows: int, pages: int):
+    # Migrates and seeds whatever DATABASE_URL points at; callers set it to the scratch database first
+    from alembic import command
+    from alembic.config import Config
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    with engine.begin() as conn:
+        for statement in SEED:
+            conn.execute(text(statement), {"rows": rows, "pages": pages})
+    # Rendered HTML, excerpts and reading times, as saving each post through the API would have stored.
+    # A separate process, so the app's async engines are never used from two event loops.
+    subprocess.run([sys.executable, "backfill.py"], cwd=BACKEND_DIR, check=True)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+    engine.dispose()
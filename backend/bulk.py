@@ -0,0 +1,209 @@
+"""Bulk post import and export as NDJSON or CSV.
+
+Imports stream the input, validate each row and upsert batches on
+external_id, one transaction per batch. Exports walk the posts table by id
+in pages, so neither direction holds the whole archive in memory.
+
+    python bulk.py import posts.ndjson
+    python bulk.py export --format csv > posts.csv
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy import select, delete, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from cache import bump_version
+from database import AsyncSessionLocal, split_tags, Post, PostTag
+from feeds import bump_feeds
+from rendering import derive_fields
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_PAGE_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+EXPORT_FIELDS = [
+    "id", "externalId", "title", "content", "category", "tags", "image", "author", "authorImage",
+    "published", "created_at", "updated_at"
+]
+EXPORT_COLUMNS = [
+    Post.id, Post.external_id, Post.title, Post.content, Post.category, Post.tags, Post.image, Post.author,
+    Post.author_image, Post.published, Post.created_at, Post.updated_at
+]
+# API field -> column for the upserted values
+IMPORT_COLUMNS = {
+    "externalId": "external_id", "title": "title", "content": "content", "category": "category",
+    "tags": "tags", "image": "image", "author": "author", "authorImage": "author_image",
+    "published": "published", "created_at": "created_at", "updated_at": "updated_at",
+}
+
+async def iter_lines(chunks):
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8") + "\n"
+    if pending:
+        yield pending.decode("utf-8")
+
+async def iter_records(chunks, fmt: str):
+    # Yields (line number, dict) with the line number of the record's first line
+    if fmt == "ndjson":
+        line_no = 0
+        async for line in iter_lines(chunks):
+            line_no += 1
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, e
+        return
+    if fmt != "csv":
+        raise ValueError(f"Unknown format: {fmt}")
+
+    header, record, start, line_no = None, "", 0, 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not record:
+            start = line_no
+        record += line
+        # A CSV record is complete once its quotes balance; quoted fields may span lines
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader(io.StringIO(record)), [])
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = values
+        else:
+            yield start, dict(zip(header, values))
+
+async def upsert_batch(db, batch: list) -> tuple:
+    """Upsert one batch; returns (post id for each row of batch, inserted, updated)."""
+    stmt = insert(Post).values(batch)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Post.external_id],
+        set_={column: stmt.excluded[column] for column in batch[0] if column not in ("external_id", "created_at")}
+    ).returning(Post.id, Post.external_id, literal_column("xmax = 0").label("inserted"))
+    rows = (await db.execute(stmt)).all()
+    # RETURNING order is not guaranteed to follow VALUES, so rows are matched by external id
+    post_ids = {row.external_id: row.id for row in rows}
+    ids = [post_ids[values["external_id"]] for values in batch]
+    await db.execute(delete(PostTag).where(PostTag.post_id.in_(ids)))
+    tags = [{"post_id": post_id, "tag": tag} for post_id, values in zip(ids, batch) for tag in split_tags(values["tags"])]
+    if tags:
+        await db.execute(insert(PostTag), tags)
+    inserted = sum(1 for row in rows if row.inserted)
+    return ids, inserted, len(rows) - inserted
+
+async def import_posts(records, model, user_id: str = None, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """Validate records against `model` and upsert them in batches.
+
+    Invalid rows are skipped and reported; valid rows around them still
+    import. Returns counts, the first errors and the affected post ids.
+    """
+    report = {"inserted": 0, "updated": 0, "failed": 0, "errors": [], "ids": []}
+    batch = {}
+
+    async def flush():
+        async with AsyncSessionLocal() as db:
+            rows = list(batch.values())
+            ids, inserted, updated = await upsert_batch(db, rows)
+            await bump_version(db, "posts")
+            await bump_version(db, "landing")
+            await bump_feeds(db, zip(ids, (row["category"] for row in rows)))
+            await db.commit()
+        report["ids"].extend(ids)
+        report["inserted"] += inserted
+        report["updated"] += updated
+        batch.clear()
+
+    async for line_no, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f"Invalid JSON: {record}")
+            post = model.model_validate(record).model_dump()
+        except (ValidationError, ValueError) as e:
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": line_no, "error": str(e)})
+            continue
+        values = {IMPORT_COLUMNS[name]: value for name, value in post.items() if name in IMPORT_COLUMNS}
+        values["created_at"] = values["created_at"] or datetime.utcnow()
+        values["updated_at"] = values["updated_at"] or values["created_at"]
+        values["user_id"] = user_id
+        # Core upserts skip Post.set_content, so the derived columns are filled here
+        values.update(derive_fields(values["content"]))
+        # A later row for the same external id replaces an earlier one in the batch
+        batch[values["external_id"]] = values
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    return report
+
+def export_row(post) -> dict:
+    return {
+        "id": post.id, "externalId": post.external_id, "title": post.title, "content": post.content,
+        "category": post.category, "tags": post.tags, "image": post.image, "author": post.author,
+        "authorImage": post.author_image, "published": post.published,
+        "created_at": post.created_at.isoformat() + "Z", "updated_at": post.updated_at.isoformat() + "Z"
+    }
+
+async def export_posts(fmt: str, page_size: int = EXPORT_PAGE_SIZE):
+    # Keyset pagination on id with a fresh session per page, so no transaction stays open while the client reads
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        yield buffer.getvalue()
+    last_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            posts = (await db.execute(
+                select(*EXPORT_COLUMNS).where(Post.id > last_id).order_by(Post.id).limit(page_size)
+            )).all()
+        if not posts:
+            return
+        last_id = posts[-1].id
+        if fmt == "csv":
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(export_row(post) for post in posts)
+            yield buffer.getvalue()
+        else:
+            yield "".join(json.dumps(export_row(post)) + "\n" for post in posts)
+
+async def read_file(path: str, chunk_size: int = 1024 * 1024):
+    with open(path, "rb") if path != "-" else sys.stdin.buffer as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import")
+    importer.add_argument("path", help="NDJSON or CSV file, or - for stdin")
+    importer.add_argument("--format", choices=["ndjson", "csv"])
+    exporter = commands.add_parser("export")
+    exporter.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args(argv)
+
+    from main import PostImport, publisher
+    if args.command == "import":
+        fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+        report = await import_posts(iter_records(read_file(args.path), fmt), PostImport)
+        publisher.schedule_many("post", report.pop("ids"))
+        await publisher.wait()
+        print(json.dumps(report, indent=2))
+    else:
+        async for chunk in export_posts(args.format):
+            sys.stdout.write(chunk)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+import json
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import ResourceVersion
+from http_cache import body_etag
+
+async def bump_version(db: AsyncSession, name: str):
+    # Runs inside the caller's transaction so the new version commits with the write
+    stmt = insert(ResourceVersion).values(name=name, version=1, updated_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ResourceVersion.name],
+        set_={"version": ResourceVersion.version + 1, "updated_at": datetime.utcnow()}
+    )
+    await db.execute(stmt)
+
+class CacheEntry:
+    def __init__(self, version: int, body: bytes, last_modified: Optional[datetime], checked_at: float):
+        self.version = version
+        self.body = body
+        self.etag = body_etag(body)
+        self.last_modified = last_modified
+        self.checked_at = checked_at
+        self._data = None
+
+    @property
+    def data(self):
+        # Parsed once per version for callers that need fields rather than the raw body
+        if self._data is None:
+            self._data = json.loads(self.body)
+        return self._data
+
+class DocumentCache:
+    """Read-through cache of pre-serialized JSON documents.
+
+    Each entry is tagged with the resource_versions row it was built from.
+    Writers bump that row; other workers notice within check_interval seconds
+    by comparing versions, which is a primary-key lookup instead of loading
+    and parsing the document. Sessions marked read_your_writes (a client that
+    just wrote, reading from the primary) always compare versions, and an
+    entry is never replaced by an older version read from a lagging replica.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._entries = {}
+
+    async def get(self, db: AsyncSession, name: str, loader, version_name: Optional[str] = None) -> CacheEntry:
+        # loader(db) returns (body bytes, last modified datetime or None); version_name defaults to name
+        now = time.monotonic()
+        entry = self._entries.get(name)
+        fresh = db.info.get("read_your_writes", False)
+        if entry and not fresh and now - entry.checked_at < self.check_interval:
+            return entry
+
+        version = await db.scalar(
+            select(ResourceVersion.version).where(ResourceVersion.name == (version_name or name))
+        ) or 0
+        if entry and entry.version >= version:
+            entry.checked_at = now
+            return entry
+
+        body, last_modified = await loader(db)
+        entry = CacheEntry(version, body, last_modified, now)
+        self._entries[name] = entry
+        return entry
+
+    def invalidate(self, name: str):
+        self._entries.pop(name, None)
@@ -0,0 +1,82 @@
+"""Delta sync for posts.
+
+Every write to posts takes the next value of post_change_seq and deletes
+leave a tombstone (see migration 0005), so a client that remembers the last
+sequence number it saw can ask for just what changed since. Each post
+appears once, at its latest change, and changes come back in sequence order.
+"""
+import asyncio
+import logging
+from sqlalchemy import select
+from database import listen, Post, PostTombstone
+from serializers import post_columns, serialize_rows
+
+logger = logging.getLogger("foxxtalk.changes")
+
+CHANNEL = "post_changes"
+
+async def load_changes(db, since: int, fields: list, limit: int) -> dict:
+    # limit + 1 from each table tells whether anything is left after the merged page
+    rows = (await db.execute(
+        select(*post_columns(fields), Post.change_seq.label("change_seq"))
+        .where(Post.change_seq > since).order_by(Post.change_seq).limit(limit + 1)
+    )).all()
+    tombstones = (await db.execute(
+        select(PostTombstone.post_id, PostTombstone.change_seq)
+        .where(PostTombstone.change_seq > since).order_by(PostTombstone.change_seq).limit(limit + 1)
+    )).all()
+
+    changes = [{"seq": row.change_seq, "op": "upsert", "post": post} for row, post in zip(rows, serialize_rows(rows, fields))]
+    changes += [{"seq": row.change_seq, "op": "delete", "id": row.post_id} for row in tombstones]
+    changes.sort(key=lambda change: change["seq"])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return {"changes": changes, "cursor": changes[-1]["seq"] if changes else since, "hasMore": has_more}
+
+class ChangeNotifier:
+    """Wakes change streams when posts are written.
+
+    One LISTEN connection per worker receives the trigger's NOTIFY and wakes
+    every waiting stream at once; streams then read their changes from the
+    database. It starts with the first subscriber and reconnects after a
+    drop. Streams also re-check on their own timeout, which covers
+    notifications missed while reconnecting and PgBouncer, where LISTEN is
+    not available (enabled=False).
+    """
+
+    def __init__(self, enabled: bool = True, retry_interval: float = 5.0):
+        self.enabled = enabled
+        self.retry_interval = retry_interval
+        self._event = asyncio.Event()
+        self._task = None
+
+    def event(self) -> asyncio.Event:
+        # Take this before reading changes so a write during the read still wakes the stream
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+        return self._event
+
+    def notify(self, *args):
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return event.is_set()
+
+    async def _run(self):
+        while True:
+            try:
+                # Streams re-read once listening starts, which picks up anything written while it was not
+                await listen(CHANNEL, self.notify, on_listening=self.notify)
+                logger.warning("Change notification connection lost; reconnecting")
+            except Exception as e:
+                logger.warning("Change notification listener failed: %s", e)
+            await asyncio.sleep(self.retry_interval)
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
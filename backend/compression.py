@@ -0,0 +1,93 @@
+import gzip
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Request, Response
+from metrics import COMPRESSION_CACHE_HITS, COMPRESSION_CACHE_MISSES, COMPRESSION_CACHE_BYTES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first; br is only offered when the brotli package is installed
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    best = max(ENCODINGS, key=lambda coding: accepted.get(coding, 0.0))
+    return best if accepted.get(best, 0.0) > 0 else None
+
+class CompressedCache:
+    """LRU of compressed response bodies keyed by (ETag, encoding).
+
+    The ETag already changes with the resource version, so entries never
+    need invalidating; stale ones fall out once max_bytes is exceeded. A hit
+    returns the stored bytes and headers without re-running the handler
+    body or the compressor. Responses it returns carry Content-Encoding,
+    which GZipMiddleware passes through untouched.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, minimum_size: int = 1000,
+                 gzip_level: int = 6, brotli_quality: int = 5):
+        self.max_bytes = max_bytes
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def encoding_for(self, request: Request) -> Optional[str]:
+        if not self.max_bytes:
+            return None
+        return negotiate_encoding(request.headers.get("accept-encoding", ""))
+
+    def get(self, etag: str, encoding: Optional[str]) -> Optional[Response]:
+        if encoding is None:
+            return None
+        entry = self._entries.get((etag, encoding))
+        if entry is None:
+            COMPRESSION_CACHE_MISSES.labels(encoding).inc()
+            return None
+        self._entries.move_to_end((etag, encoding))
+        COMPRESSION_CACHE_HITS.labels(encoding).inc()
+        body, headers = entry
+        return Response(content=body, headers=headers)
+
+    def put(self, etag: str, encoding: Optional[str], response: Response) -> Response:
+        # Compresses a fully built response in place and remembers the result
+        if encoding is None or len(response.body) < self.minimum_size:
+            return response
+        body = self.compress(response.body, encoding)
+        response.body = body
+        response.headers["content-length"] = str(len(body))
+        response.headers["content-encoding"] = encoding
+        response.headers.add_vary_header("Accept-Encoding")
+        if len(body) <= self.max_bytes:
+            self._store((etag, encoding), body, dict(response.headers))
+        return response
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, self.gzip_level, mtime=0)
+
+    def _store(self, key, body: bytes, headers: dict):
+        previous = self._entries.pop(key, None)
+        if previous:
+            self.size -= len(previous[0])
+        self._entries[key] = (body, headers)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        COMPRESSION_CACHE_BYTES.set(self.size)
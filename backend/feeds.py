@@ -0,0 +1,162 @@
+"""sitemap.xml and RSS/Atom feeds built from post and page metadata.
+
+Nothing here reads post bodies. Every document is versioned separately in
+resource_versions so a post write only invalidates what lists it: the
+sitemap index, the id-range shard holding the post, the site feeds and the
+feeds of its category.
+"""
+import re
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+from sqlalchemy import select, func
+from cache import bump_version
+from database import Post, Page
+from http_cache import http_date
+
+# The sitemaps.org limit per file; larger sites get an index of id-range shards
+SITEMAP_MAX_URLS = 50_000
+FEED_SIZE = 50
+STATIC_PATHS = ["/", "/blog", "/terms", "/privacy", "/cookies"]
+
+# Characters XML 1.0 does not allow at all, even escaped
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def xml_text(value) -> str:
+    return escape(INVALID_XML_CHARS.sub("", value or ""))
+
+def post_shard(post_id: int) -> int:
+    return (post_id - 1) // SITEMAP_MAX_URLS + 1
+
+async def bump_feeds(db, posts):
+    # posts: (id, category) pairs that were created, changed or deleted; runs in the writer's transaction
+    posts = list(posts)
+    names = {"sitemap", "feeds"}
+    names.update(f"sitemap:posts-{post_shard(post_id)}" for post_id, _ in posts)
+    names.update(f"feeds:{category}" for _, category in posts)
+    for name in sorted(names):
+        await bump_version(db, name)
+
+def w3c_date(value) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def urlset(urls) -> bytes:
+    # urls: (location, last modified or None)
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for loc, lastmod in urls:
+        lastmod = f"<lastmod>{w3c_date(lastmod)}</lastmod>" if lastmod else ""
+        parts.append(f"<url><loc>{escape(loc)}</loc>{lastmod}</url>\n")
+    parts.append("</urlset>\n")
+    return "".join(parts).encode()
+
+def sitemap_index(sitemaps) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for loc, lastmod in sitemaps:
+        lastmod = f"<lastmod>{w3c_date(lastmod)}</lastmod>" if lastmod else ""
+        parts.append(f"<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>\n")
+    parts.append("</sitemapindex>\n")
+    return "".join(parts).encode()
+
+async def page_urls(db, site_url: str) -> list:
+    pages = await db.execute(
+        select(Page.slug, Page.updated_at).where(Page.published == True)
+        .order_by(Page.slug).limit(SITEMAP_MAX_URLS - len(STATIC_PATHS))
+    )
+    return [(site_url + path, None) for path in STATIC_PATHS] + [(f"{site_url}/{quote(slug)}", updated_at) for slug, updated_at in pages]
+
+async def post_urls(db, site_url: str, shard: int = None) -> list:
+    query = select(Post.id, Post.updated_at).where(Post.published == True)
+    if shard:
+        query = query.where(Post.id > (shard - 1) * SITEMAP_MAX_URLS, Post.id <= shard * SITEMAP_MAX_URLS)
+    rows = await db.execute(query.order_by(Post.id))
+    return [(f"{site_url}/blog/{post_id}", updated_at) for post_id, updated_at in rows]
+
+def newest(urls):
+    return max((lastmod for _, lastmod in urls if lastmod), default=None)
+
+async def load_sitemap(db, site_url: str):
+    posts = await db.scalar(select(func.count()).select_from(Post).where(Post.published == True))
+    pages = await db.scalar(select(func.count()).select_from(Page).where(Page.published == True))
+    if posts + pages + len(STATIC_PATHS) <= SITEMAP_MAX_URLS:
+        urls = await page_urls(db, site_url) + await post_urls(db, site_url)
+        return urlset(urls), newest(urls)
+
+    shards = await db.execute(
+        select(((Post.id - 1) // SITEMAP_MAX_URLS + 1).label("shard"), func.max(Post.updated_at))
+        .where(Post.published == True).group_by("shard").order_by("shard")
+    )
+    page_lastmod = await db.scalar(select(func.max(Page.updated_at)).where(Page.published == True))
+    sitemaps = [(f"{site_url}/sitemaps/pages.xml", page_lastmod)]
+    sitemaps += [(f"{site_url}/sitemaps/posts-{shard}.xml", lastmod) for shard, lastmod in shards]
+    return sitemap_index(sitemaps), newest(sitemaps)
+
+async def load_post_sitemap(db, site_url: str, shard: int):
+    urls = await post_urls(db, site_url, shard)
+    return urlset(urls), newest(urls)
+
+async def load_page_sitemap(db, site_url: str):
+    urls = await page_urls(db, site_url)
+    return urlset(urls), newest(urls)
+
+async def shard_exists(db, shard: int) -> bool:
+    return await db.scalar(
+        select(Post.id).where(
+            Post.published == True, Post.id > (shard - 1) * SITEMAP_MAX_URLS, Post.id <= shard * SITEMAP_MAX_URLS
+        ).limit(1)
+    ) is not None
+
+async def category_exists(db, category: str) -> bool:
+    return await db.scalar(select(Post.id).where(Post.published == True, Post.category == category).limit(1)) is not None
+
+async def feed_posts(db, category: str = None) -> list:
+    query = select(Post.id, Post.title, Post.category, Post.author, Post.created_at, Post.updated_at).where(Post.published == True)
+    if category:
+        query = query.where(Post.category == category)
+    return (await db.execute(query.order_by(Post.created_at.desc(), Post.id.desc()).limit(FEED_SIZE))).all()
+
+def rss(posts, site_url: str, title: str, self_url: str) -> bytes:
+    updated = max((post.updated_at for post in posts), default=None)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n',
+        f"<title>{xml_text(title)}</title>\n<link>{escape(site_url)}/blog</link>\n<description>{xml_text(title)}</description>\n",
+        f'<atom:link href={quoteattr(self_url)} rel="self" type="application/rss+xml"/>\n',
+    ]
+    if updated:
+        parts.append(f"<lastBuildDate>{http_date(updated)}</lastBuildDate>\n")
+    for post in posts:
+        link = escape(f"{site_url}/blog/{post.id}")
+        parts.append(
+            f"<item><title>{xml_text(post.title)}</title><link>{link}</link>"
+            f'<guid isPermaLink="true">{link}</guid><pubDate>{http_date(post.created_at)}</pubDate>'
+            f"<category>{xml_text(post.category)}</category></item>\n"
+        )
+    parts.append("</channel>\n</rss>\n")
+    return "".join(parts).encode()
+
+def atom(posts, site_url: str, title: str, self_url: str) -> bytes:
+    updated = max((post.updated_at for post in posts), default=None)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n',
+        f"<title>{xml_text(title)}</title>\n<id>{escape(self_url)}</id>\n",
+        f'<link href={quoteattr(site_url + "/blog")}/>\n<link rel="self" href={quoteattr(self_url)}/>\n',
+        f"<updated>{w3c_date(updated) if updated else '1970-01-01T00:00:00Z'}</updated>\n",
+        f"<author><name>{xml_text(title)}</name></author>\n",
+    ]
+    for post in posts:
+        link = f"{site_url}/blog/{post.id}"
+        author = f"<author><name>{xml_text(post.author)}</name></author>" if post.author else ""
+        parts.append(
+            f"<entry><title>{xml_text(post.title)}</title><id>{escape(link)}</id><link href={quoteattr(link)}/>"
+            f"<published>{w3c_date(post.created_at)}</published><updated>{w3c_date(post.updated_at)}</updated>"
+            f"{author}<category term={quoteattr(INVALID_XML_CHARS.sub('', post.category or ''))}/></entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode()
+
+FEED_FORMATS = {"rss": (rss, "application/rss+xml"), "atom": (atom, "application/atom+xml")}
+
+async def load_feed(db, site_url: str, site_name: str, fmt: str, category: str = None):
+    posts = await feed_posts(db, category)
+    title = f"{site_name}: {category}" if category else site_name
+    self_url = f"{site_url}/feeds/{quote(category, safe='')}/{fmt}.xml" if category else f"{site_url}/feeds/{fmt}.xml"
+    render, _ = FEED_FORMATS[fmt]
+    return render(posts, site_url, title, self_url), max((post.updated_at for post in posts), default=None)
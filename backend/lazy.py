@@ -0,0 +1,26 @@
+import threading
+
+class Lazy:
+    """Zero-argument callable that builds its value on the first call.
+
+    Used for clients whose import or construction is slow (boto3 resolves
+    its credential chain when a client is created), so a worker can start
+    serving before they are needed. Thread-safe: media uploads reach the
+    S3 client from executor threads.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self.factory()
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
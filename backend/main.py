@@ -1,41 +1,157 @@
-from fastapi import FastAPI, UploadFile, File, Request, Depends, HTTPException, Response
+from fastapi import FastAPI, UploadFile, File, Request, Depends, HTTPException, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
-from sqlalchemy.orm import Session
-import uuid
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import time
 import hashlib
-import secrets
-import boto3
-from datetime import datetime
-from database import get_db, User, Post as DBPost, Page, LandingPage, BlogSettings, GlobalSettings
+import base64
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from auth import InvalidToken, check_secret_key, issue_token, decode_token, sign_value, unsign_value, make_revocation_store
+from cache import DocumentCache, bump_version
+from media import MediaPipeline, S3Storage, LocalStorage, UploadTooLarge, InvalidImage
+from publish import Publisher, LocalSnapshotStore, S3SnapshotStore
+from compression import CompressedCache
+from feeds import FEED_FORMATS, bump_feeds, load_sitemap, load_post_sitemap, load_page_sitemap, load_feed, shard_exists, category_exists
+from serializers import POST_FIELDS, DERIVED_FIELDS, SUMMARY_FIELDS, DETAIL_FIELDS, PAGE_FIELDS, DEFAULT_FEATURED_POSTS, MAX_FEATURED_POSTS, FastJSONResponse, dumps, featured_count, post_columns, summary_columns, serialize_rows, serialize_post
+from http_cache import make_etag, is_not_modified, set_validators, not_modified
+from metrics import render_metrics, HTTP_REQUESTS_TOTAL, HTTP_REQUEST_ERRORS_TOTAL, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+from request_log import RequestLogger
+from ratelimit import make_rate_limiter, parse_rate
+from analytics import ViewRecorder, view_summary
+from ai_jobs import AIJobQueue, JobRejected, make_model
+from bulk import iter_records, import_posts, export_posts
+from lazy import Lazy
+from changes import ChangeNotifier, load_changes
+from database import AsyncSessionLocal, DB_PGBOUNCER, get_db, check_database, warm_pools, dispose_engines, replica_router, split_tags, User, Post as DBPost, PostTag, Page, LandingPage, BlogSettings, GlobalSettings, ResourceVersion
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tokens are signed with SECRET_KEY, so refuse to serve with a missing or published one
+    check_secret_key(SECRET_KEY)
+    # Nothing here blocks serving: replica checks and pool warmup run in the background
+    replica_router.start()
+    warmup = asyncio.create_task(warm_pools())
+    yield
+    warmup.cancel()
+    change_notifier.close()
+    try:
+        await view_recorder.close()
+    finally:
+        await dispose_engines()
 
-app = FastAPI(title="FoxxTalk API", version="1.0.0")
+app = FastAPI(title="FoxxTalk API", version="1.0.0", lifespan=lifespan)
 
 # Configuration
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'admin@slyyfoxxmedia.com')
 ADMIN_PASSWORD_HASH = os.getenv('ADMIN_PASSWORD_HASH', hashlib.sha256('admin123'.encode()).hexdigest())
-SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
+SECRET_KEY = os.getenv('SECRET_KEY', '')
 AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
 S3_BUCKET = os.getenv('S3_BUCKET', 'foxxtalk-media')
 CLOUDFRONT_DOMAIN = os.getenv('CLOUDFRONT_DOMAIN')
+# "s3" in production; "local" writes to MEDIA_LOCAL_ROOT for tests and development
+MEDIA_STORAGE = os.getenv('MEDIA_STORAGE', 's3')
+MEDIA_LOCAL_ROOT = os.getenv('MEDIA_LOCAL_ROOT', 'media')
+MEDIA_LOCAL_URL = os.getenv('MEDIA_LOCAL_URL', 'http://localhost:8000/media')
+MEDIA_WORKERS = int(os.getenv('MEDIA_WORKERS', '2'))
+MEDIA_MAX_UPLOAD_MB = float(os.getenv('MEDIA_MAX_UPLOAD_MB', '20'))
+# Publish-time JSON snapshots: "" disables, "local" writes to PUBLISH_LOCAL_ROOT, "s3" to S3_BUCKET/PUBLISH_S3_PREFIX
+PUBLISH_TARGET = os.getenv('PUBLISH_TARGET', '')
+PUBLISH_LOCAL_ROOT = os.getenv('PUBLISH_LOCAL_ROOT', 'snapshots')
+PUBLISH_S3_PREFIX = os.getenv('PUBLISH_S3_PREFIX', 'snapshots')
+# How stale another worker's settings save may look before this worker re-checks the version
+DOCUMENT_CACHE_CHECK_INTERVAL = float(os.getenv('DOCUMENT_CACHE_CHECK_INTERVAL', '1.0'))
+# Cache-Control for public GETs; nginx and the CDN revalidate with ETag / Last-Modified
+PUBLIC_CACHE_MAX_AGE = int(os.getenv('PUBLIC_CACHE_MAX_AGE', '0'))
+PUBLIC_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv('PUBLIC_CACHE_STALE_WHILE_REVALIDATE', '60'))
+PUBLIC_CACHE_CONTROL = f"public, max-age={PUBLIC_CACHE_MAX_AGE}, stale-while-revalidate={PUBLIC_CACHE_STALE_WHILE_REVALIDATE}"
+# Public site origin and name used in sitemap.xml and the RSS/Atom feeds
+SITE_URL = os.getenv('SITE_URL', 'https://slyyfoxxmedia.com').rstrip('/')
+SITE_NAME = os.getenv('SITE_NAME', 'FoxxTalk')
+# Memory budget for precompressed gzip/br bodies of public GETs, keyed by ETag; 0 leaves compression to GZipMiddleware
+COMPRESSION_CACHE_MB = float(os.getenv('COMPRESSION_CACHE_MB', '32'))
+TOKEN_TTL = int(os.getenv('TOKEN_TTL', '86400'))  # 24 hours
+# "postgres" shares logouts across workers; "memory" is for tests and single-process runs
+TOKEN_REVOCATION_BACKEND = os.getenv('TOKEN_REVOCATION_BACKEND', 'postgres')
+TOKEN_REVOCATION_REFRESH_INTERVAL = float(os.getenv('TOKEN_REVOCATION_REFRESH_INTERVAL', '5.0'))
+# Fraction of fast, successful requests written to the access log; errors and slow requests are always logged
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+LOG_SLOW_REQUEST_MS = float(os.getenv('LOG_SLOW_REQUEST_MS', '500'))
+# View beacons are buffered per worker and COPYed in batches; admin analytics read the rollup tables
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', '2.0'))
+ANALYTICS_ROLLUP_INTERVAL = float(os.getenv('ANALYTICS_ROLLUP_INTERVAL', '60'))
+ANALYTICS_RETENTION_DAYS = int(os.getenv('ANALYTICS_RETENTION_DAYS', '90'))
+# AI generation runs as background jobs; "fake" is the built-in deterministic model
+AI_BACKEND = os.getenv('AI_BACKEND', 'fake')
+AI_WORKERS = int(os.getenv('AI_WORKERS', '4'))
+AI_JOBS_PER_USER = int(os.getenv('AI_JOBS_PER_USER', '2'))
+AI_JOB_TIMEOUT = float(os.getenv('AI_JOB_TIMEOUT', '60'))
+AI_CACHE_SIZE = int(os.getenv('AI_CACHE_SIZE', '1000'))
+# Delta sync: changes per page, and how often an idle change stream re-checks and sends a keep-alive
+CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', '500'))
+CHANGES_STREAM_HEARTBEAT = float(os.getenv('CHANGES_STREAM_HEARTBEAT', '15'))
+READINESS_TIMEOUT = float(os.getenv('READINESS_TIMEOUT', '2'))
+# Token-bucket rate limits per client IP: "memory" is per worker, "redis" is shared through REDIS_URL
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+# Only trust X-Real-IP when the API sits behind the nginx proxy
+RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+RATE_LIMIT_DEFAULT = parse_rate(os.getenv('RATE_LIMIT_DEFAULT', '300/minute'))
+# (method, path prefix, rate); the first match wins, anything else gets RATE_LIMIT_DEFAULT
+RATE_LIMIT_POLICIES = [
+    ("POST", "/api/auth/login", parse_rate(os.getenv('RATE_LIMIT_LOGIN', '5/minute'))),
+    ("POST", "/api/upload/", parse_rate(os.getenv('RATE_LIMIT_UPLOAD', '30/minute'))),
+    ("POST", "/api/ai/", parse_rate(os.getenv('RATE_LIMIT_AI', '10/minute'))),
+]
+RATE_LIMIT_EXEMPT = {"/healthz", "/readyz", "/metrics"}
 
 security = HTTPBearer()
-active_tokens = set()  # In production, use Redis
-
-# S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name='us-east-1'
+document_cache = DocumentCache(check_interval=DOCUMENT_CACHE_CHECK_INTERVAL)
+compressed_cache = CompressedCache(max_bytes=int(COMPRESSION_CACHE_MB * 1024 * 1024))
+request_logger = RequestLogger(LOG_SAMPLE_RATE, LOG_SLOW_REQUEST_MS)
+view_recorder = ViewRecorder(
+    flush_interval=ANALYTICS_FLUSH_INTERVAL, rollup_interval=ANALYTICS_ROLLUP_INTERVAL, retention_days=ANALYTICS_RETENTION_DAYS
+)
+ai_jobs = AIJobQueue(
+    make_model(AI_BACKEND), workers=AI_WORKERS, per_user=AI_JOBS_PER_USER,
+    timeout=AI_JOB_TIMEOUT, cache_size=AI_CACHE_SIZE
 )
+# LISTEN needs a session-level connection, which transaction pooling does not give
+change_notifier = ChangeNotifier(enabled=not DB_PGBOUNCER)
+rate_limiter = make_rate_limiter(RATE_LIMIT_BACKEND, REDIS_URL)
+revocation_store = make_revocation_store(TOKEN_REVOCATION_BACKEND, TOKEN_REVOCATION_REFRESH_INTERVAL)
+
+def make_s3_client():
+    import boto3
+    return boto3.client(
+        's3',
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name='us-east-1'
+    )
+
+# Built on the first upload or snapshot write rather than while the worker boots
+s3_client = Lazy(make_s3_client)
+
+if MEDIA_STORAGE == 'local':
+    media_storage = LocalStorage(MEDIA_LOCAL_ROOT, MEDIA_LOCAL_URL)
+    os.makedirs(MEDIA_LOCAL_ROOT, exist_ok=True)
+    app.mount("/media", StaticFiles(directory=MEDIA_LOCAL_ROOT), name="media")
+else:
+    media_storage = S3Storage(s3_client, S3_BUCKET, CLOUDFRONT_DOMAIN)
+media_pipeline = MediaPipeline(media_storage, workers=MEDIA_WORKERS, max_bytes=int(MEDIA_MAX_UPLOAD_MB * 1024 * 1024))
 
 # Security middleware
 app.add_middleware(
@@ -53,43 +169,106 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag", "Last-Modified", "X-RateLimit-Limit", "X-RateLimit-Remaining", "Retry-After"],
 )
 
 # Rate limiting middleware
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
-    # Simple rate limiting - in production use Redis
+    path = request.url.path
+    if path in RATE_LIMIT_EXEMPT or request.method == "OPTIONS":
+        return await call_next(request)
+    policy, rate = "default", RATE_LIMIT_DEFAULT
+    for method, prefix, policy_rate in RATE_LIMIT_POLICIES:
+        if request.method == method and path.startswith(prefix):
+            policy, rate = prefix, policy_rate
+            break
+    client = request.headers.get("x-real-ip") if RATE_LIMIT_TRUST_PROXY else None
+    client = client or (request.client.host if request.client else "unknown")
+
+    result = await rate_limiter.hit(f"{policy}:{client}", rate)
+    if not result.allowed:
+        return JSONResponse(status_code=429, content={"detail": "Too many requests"}, headers=result.headers())
     response = await call_next(request)
-    response.headers["X-RateLimit-Limit"] = "100"
+    response.headers.update(result.headers())
     return response
 
-# Request logging middleware
+def route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps (e.g. /media) and 404s collapse to one label each
+    path = request.scope.get("root_path", "") + request.scope["path"]
+    return next((m.path for m in app.routes if isinstance(m, Mount) and path.startswith(m.path + "/")), "unmatched")
+
+# Request logging and metrics middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    print(f"{request.method} {request.url} - {response.status_code} - {process_time:.3f}s")
-    return response
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        route = route_template(request)
+        HTTP_REQUESTS_TOTAL.labels(request.method, route, str(status)).inc()
+        HTTP_REQUEST_SECONDS.labels(request.method, route).observe(elapsed)
+        if status >= 500:
+            HTTP_REQUEST_ERRORS_TOTAL.labels(request.method, route).inc()
+        request_logger.log(request.method, route, request.url.path, status, elapsed * 1000)
 
 # Token authentication
-async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    if token not in active_tokens:
+async def verify_token(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # Signed tokens carry the user, so the common case needs no database round trip
+    try:
+        payload = decode_token(SECRET_KEY, credentials.credentials)
+    except InvalidToken:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    if await revocation_store.is_revoked(payload["jti"]):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    if request.method not in ("GET", "HEAD"):
+        # This client's reads stay on the primary for a while so the admin sees their own write
+        request.state.read_primary_until = int(time.time() + replica_router.sticky_seconds)
     
-    # Get user from database
-    user = db.query(User).filter(User.email == current_admin_email).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    return {"id": user.id, "email": user.email}
+    return {"id": payload["sub"], "email": payload["email"]}
 
 # Optional auth dependency
-async def optional_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))):
+async def optional_auth(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))):
     if not credentials:
         return None
-    return await verify_token(credentials)
+    return await verify_token(request, credentials)
+
+READ_PRIMARY_COOKIE = "read_primary"
+
+def reads_primary(request: Request) -> bool:
+    # Signed "read-primary:<unix time>" cookie set after an authenticated write, valid on every worker
+    value = unsign_value(SECRET_KEY, request.cookies.get(READ_PRIMARY_COOKIE, ""))
+    prefix, _, until = (value or "").partition(":")
+    return prefix == "read-primary" and until.isdigit() and int(until) > time.time()
+
+if replica_router.replicas:
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        until = getattr(request.state, "read_primary_until", None)
+        if until:
+            response.set_cookie(
+                READ_PRIMARY_COOKIE, sign_value(SECRET_KEY, f"read-primary:{until}"),
+                max_age=int(replica_router.sticky_seconds), httponly=True, samesite="lax"
+            )
+        return response
+
+async def get_read_db(request: Request):
+    # Public reads go to a healthy, caught-up replica unless this client wrote recently
+    primary = bool(replica_router.replicas) and reads_primary(request)
+    async with replica_router.session(primary) as db:
+        # Lets DocumentCache skip entries that may predate the client's write
+        db.info["read_your_writes"] = primary
+        yield db
 
 class LoginRequest(BaseModel):
     email: str
@@ -112,6 +291,25 @@ class Post(BaseModel):
     authorImage: str = ""
     published: bool = True
 
+class PostImport(Post):
+    # Bulk import rows: upserted on externalId, timestamps preserved when given
+    externalId: str = Field(min_length=1)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @field_validator("created_at", "updated_at", mode="before")
+    @classmethod
+    def blank_as_none(cls, value):
+        return value or None
+
+    @field_validator("created_at", "updated_at")
+    @classmethod
+    def as_naive_utc(cls, value):
+        # The columns hold naive UTC; exports write "...Z"
+        if value and value.tzinfo:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 class PostResponse(BaseModel):
     id: int
     title: str
@@ -125,17 +323,55 @@ class PostResponse(BaseModel):
     created_at: str
     updated_at: str
     user_id: str
+    html: Optional[str] = None
+    wordCount: Optional[int] = None
+    readingTime: Optional[int] = None
+    firstImage: Optional[str] = None
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, post_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(post_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_post_fields(fields: Optional[str], view: str) -> List[str]:
+    if not fields:
+        return SUMMARY_FIELDS if view == "summary" else list(POST_FIELDS)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in POST_FIELDS and f not in DERIVED_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
 
 class LandingPageData(BaseModel):
     hero: dict
     featuredPosts: dict
     sections: list = []
 
+    @field_validator("featuredPosts")
+    @classmethod
+    def check_featured_count(cls, value):
+        count = value.get("count", DEFAULT_FEATURED_POSTS)
+        if isinstance(count, str) and count.strip().isdigit():
+            count = int(count)
+        if isinstance(count, bool) or not isinstance(count, int) or not 0 <= count <= MAX_FEATURED_POSTS:
+            raise ValueError(f"featuredPosts.count must be a whole number from 0 to {MAX_FEATURED_POSTS}")
+        return {**value, "count": count}
+
 
 
 # Initialize admin user
-def init_admin_user(db: Session):
-    admin_user = db.query(User).filter(User.email == ADMIN_EMAIL).first()
+async def init_admin_user(db: AsyncSession):
+    admin_user = await db.scalar(select(User).where(User.email == ADMIN_EMAIL).limit(1))
     if not admin_user:
         admin_user = User(
             id="admin-001",
@@ -143,33 +379,205 @@ def init_admin_user(db: Session):
             password_hash=ADMIN_PASSWORD_HASH
         )
         db.add(admin_user)
-        db.commit()
+        await db.commit()
     return admin_user
 
-@app.get("/api/posts", response_model=List[PostResponse])
-async def get_posts(db: Session = Depends(get_db)):
-    posts = db.query(DBPost).filter(DBPost.published == True).order_by(DBPost.created_at.desc()).all()
-    return [{
-        "id": p.id, "title": p.title, "content": p.content, "category": p.category,
-        "tags": p.tags, "image": p.image, "author": p.author, "authorImage": p.author_image,
-        "published": p.published, "created_at": p.created_at.isoformat() + "Z",
-        "updated_at": p.updated_at.isoformat() + "Z", "user_id": p.user_id
-    } for p in posts]
+# Health checks: liveness never touches the database, readiness opens one short-lived connection
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    try:
+        await asyncio.wait_for(check_database(), READINESS_TIMEOUT)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "database": str(e) or type(e).__name__})
+    return {"status": "ready", "database": "ok"}
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/api/posts")
+async def get_posts(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    selected = parse_post_fields(fields, view)
+
+    # Deletes do not move max(updated_at), so the "posts" version row covers them
+    posts_changed = select(ResourceVersion.updated_at).where(ResourceVersion.name == "posts").scalar_subquery()
+    total, newest, changed = (await db.execute(
+        select(func.count(), func.max(DBPost.updated_at), posts_changed).where(DBPost.published == True)
+    )).one()
+    last_modified = max((d for d in (newest, changed) if d), default=None)
+    etag = make_etag("posts", total, newest, changed, request.url.query)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, PUBLIC_CACHE_CONTROL)
+    # The ETag covers the query string and posts version, so a cached body skips the listing query too
+    encoding = compressed_cache.encoding_for(request)
+    cached = compressed_cache.get(etag, encoding)
+    if cached:
+        return cached
+
+    # Keyset columns go last under their own labels so the selected fields line up with each row tuple
+    columns = post_columns(selected) + [DBPost.created_at.label("cursor_created_at"), DBPost.id.label("cursor_id")]
+    query = select(*columns).where(DBPost.published == True)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(DBPost.created_at, DBPost.id) < tuple_(cursor_created_at, cursor_id))
+    rows = (await db.execute(query.order_by(DBPost.created_at.desc(), DBPost.id.desc()).limit(limit + 1))).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response = FastJSONResponse(serialize_rows(rows, selected), headers={"X-Total-Count": str(total)})
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].cursor_created_at, rows[-1].cursor_id)
+    set_validators(response, etag, last_modified, PUBLIC_CACHE_CONTROL)
+    return compressed_cache.put(etag, encoding, response)
+
+# Declared before /api/posts/{post_id} so "search" is not parsed as an id
+@app.get("/api/posts/search")
+async def search_posts(
+    q: str = "",
+    category: Optional[str] = None,
+    tag: List[str] = Query([]),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db)
+):
+    filters = [DBPost.published == True]
+    if category:
+        filters.append(DBPost.category == category)
+    for name in split_tags(",".join(tag)):
+        filters.append(DBPost.id.in_(select(PostTag.post_id).where(PostTag.tag == name)))
+
+    columns = summary_columns()
+    order_by = [DBPost.created_at.desc(), DBPost.id.desc()]
+    if q.strip():
+        ts_query = func.websearch_to_tsquery("english", q)
+        filters.append(DBPost.search_vector.op("@@")(ts_query))
+        rank = func.ts_rank_cd(DBPost.search_vector, ts_query)
+        columns.append(rank.label("rank"))
+        columns.append(func.ts_headline(
+            "english", DBPost.content, ts_query,
+            "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+        ).label("snippet"))
+        order_by.insert(0, rank.desc())
+
+    total = await db.scalar(select(func.count(DBPost.id)).where(*filters))
+    rows = (await db.execute(select(*columns).where(*filters).order_by(*order_by).offset(offset).limit(limit))).all()
+
+    results = serialize_rows(rows, SUMMARY_FIELDS)
+    if q.strip():
+        for item, row in zip(results, rows):
+            item["rank"] = row.rank
+            item["snippet"] = row.snippet
+    return FastJSONResponse(results, headers={"X-Total-Count": str(total)})
+
+BULK_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@app.post("/api/posts/import")
+async def bulk_import_posts(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$"), user: dict = Depends(verify_token)):
+    # Streams the request body; each batch commits on its own, so a failure keeps earlier batches
+    report = await import_posts(iter_records(request.stream(), format), PostImport, user_id=user["id"])
+    document_cache.invalidate("landing")
+    publisher.schedule_many("post", report.pop("ids"))
+    return report
+
+@app.get("/api/posts/export")
+async def bulk_export_posts(format: str = Query("ndjson", pattern="^(ndjson|csv)$"), user: dict = Depends(verify_token)):
+    return StreamingResponse(
+        export_posts(format), media_type=BULK_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="posts.{format}"'}
+    )
+
+# Events must reach the client as they are written: GZipMiddleware passes an identity-encoded
+# body through instead of buffering it in the compressor, and nginx skips proxy buffering
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+
+def parse_change_fields(fields: Optional[str], view: str) -> List[str]:
+    # Clients merge changes by id, so it is always included
+    selected = parse_post_fields(fields, view)
+    return selected if "id" in selected else ["id"] + selected
+
+@app.get("/api/posts/changes")
+async def get_post_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_PAGE_SIZE),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
+    user: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    # Drafts included; read from the primary, where the change sequence is current
+    return FastJSONResponse(await load_changes(db, since, parse_change_fields(fields, view), limit))
+
+@app.get("/api/posts/changes/stream")
+async def stream_post_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
+    user: dict = Depends(verify_token)
+):
+    selected = parse_change_fields(fields, view)
+    # A reconnecting EventSource resumes from the last id it received
+    last_event_id = request.headers.get("last-event-id", "")
+    cursor = int(last_event_id) if last_event_id.isdigit() else since
+
+    async def events():
+        nonlocal cursor
+        while True:
+            wakeup = change_notifier.event()
+            # A session per read, so an idle stream holds no connection
+            async with AsyncSessionLocal() as db:
+                page = await load_changes(db, cursor, selected, CHANGES_PAGE_SIZE)
+            for change in page["changes"]:
+                yield f"id: {change['seq']}\nevent: change\ndata: {dumps(change).decode()}\n\n"
+            cursor = page["cursor"]
+            if not page["hasMore"] and not await change_notifier.wait(wakeup, CHANGES_STREAM_HEARTBEAT):
+                yield ": keep-alive\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream", headers=EVENT_STREAM_HEADERS)
+
+def post_validators(post_id: int, change_seq: int, updated_at: datetime, rendered_at: Optional[datetime]) -> tuple:
+    return make_etag("post", post_id, change_seq), max(d for d in (updated_at, rendered_at) if d)
 
 @app.get("/api/posts/{post_id}", response_model=PostResponse)
-async def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.query(DBPost).filter(DBPost.id == post_id, DBPost.published == True).first()
-    if not post:
+async def get_post(post_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    # Validate before loading the body. change_seq moves on every write to the row, including the
+    # backfill's re-render, which leaves updated_at alone; the "post-render" version it bumps keeps
+    # Last-Modified moving for clients that only send If-Modified-Since.
+    validators = [DBPost.change_seq, DBPost.updated_at, select(ResourceVersion.updated_at).where(ResourceVersion.name == "post-render").scalar_subquery()]
+    version = (await db.execute(select(*validators).where(DBPost.id == post_id, DBPost.published == True))).first()
+    if version is None:
         raise HTTPException(status_code=404, detail="Post not found")
-    return {
-        "id": post.id, "title": post.title, "content": post.content, "category": post.category,
-        "tags": post.tags, "image": post.image, "author": post.author, "authorImage": post.author_image,
-        "published": post.published, "created_at": post.created_at.isoformat() + "Z",
-        "updated_at": post.updated_at.isoformat() + "Z", "user_id": post.user_id
-    }
+    etag, last_modified = post_validators(post_id, *version)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, PUBLIC_CACHE_CONTROL)
+    encoding = compressed_cache.encoding_for(request)
+    cached = compressed_cache.get(etag, encoding)
+    if cached:
+        return cached
+
+    # Validators selected again with the body, in case the post changed in between
+    row = (await db.execute(select(*post_columns(DETAIL_FIELDS), *validators).where(DBPost.id == post_id, DBPost.published == True))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Post not found")
+    post = dict(zip(DETAIL_FIELDS, row))
+    etag, last_modified = post_validators(post_id, *row[len(DETAIL_FIELDS):])
+    response = FastJSONResponse(post)
+    set_validators(response, etag, last_modified, PUBLIC_CACHE_CONTROL)
+    return compressed_cache.put(etag, encoding, response)
 
 @app.post("/api/posts", response_model=PostResponse)
-async def create_post(post: Post, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
+async def create_post(post: Post, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     db_post = DBPost(
         title=post.title,
         content=post.content,
@@ -182,32 +590,29 @@ async def create_post(post: Post, user: dict = Depends(verify_token), db: Sessio
         user_id=user["id"]
     )
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
-    
-    return {
-        "id": db_post.id, "title": db_post.title, "content": db_post.content, "category": db_post.category,
-        "tags": db_post.tags, "image": db_post.image, "author": db_post.author, "authorImage": db_post.author_image,
-        "published": db_post.published, "created_at": db_post.created_at.isoformat() + "Z",
-        "updated_at": db_post.updated_at.isoformat() + "Z", "user_id": db_post.user_id
-    }
-
-# Store current credentials
-current_password_hash = ADMIN_PASSWORD_HASH
-current_admin_email = ADMIN_EMAIL
+    await db.flush()
+    db.add_all(PostTag(post_id=db_post.id, tag=tag) for tag in split_tags(post.tags))
+    await bump_version(db, "posts")
+    await bump_version(db, "landing")
+    await bump_feeds(db, [(db_post.id, db_post.category)])
+    await db.commit()
+    await db.refresh(db_post)
+    document_cache.invalidate("landing")
+    publisher.schedule("post", db_post.id)
+    
+    return serialize_post(db_post)
 
 @app.post("/api/auth/login")
-async def login(request: LoginRequest, response: Response, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, response: Response, db: AsyncSession = Depends(get_db)):
     
     # Initialize admin user if not exists
-    init_admin_user(db)
+    await init_admin_user(db)
     
     password_hash = hashlib.sha256(request.password.encode()).hexdigest()
-    user = db.query(User).filter(User.email == request.email, User.password_hash == password_hash).first()
+    user = await db.scalar(select(User).where(User.email == request.email, User.password_hash == password_hash).limit(1))
     
     if user:
-        token = secrets.token_urlsafe(32)
-        active_tokens.add(token)
+        token = issue_token(SECRET_KEY, user.id, user.email, TOKEN_TTL)
         
         # Set cross-subdomain cookie
         response.set_cookie(
@@ -217,7 +622,7 @@ async def login(request: LoginRequest, response: Response, db: Session = Depends
             secure=True,
             httponly=True,
             samesite="lax",
-            max_age=86400  # 24 hours
+            max_age=TOKEN_TTL
         )
         
         return {
@@ -228,8 +633,8 @@ async def login(request: LoginRequest, response: Response, db: Session = Depends
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
 @app.post("/api/auth/change-password")
-async def change_password(request: ChangePasswordRequest, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == user["id"]).first()
+async def change_password(request: ChangePasswordRequest, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    db_user = await db.get(User, user["id"])
     
     current_hash = hashlib.sha256(request.currentPassword.encode()).hexdigest()
     if current_hash != db_user.password_hash:
@@ -237,15 +642,15 @@ async def change_password(request: ChangePasswordRequest, user: dict = Depends(v
     
     new_hash = hashlib.sha256(request.newPassword.encode()).hexdigest()
     db_user.password_hash = new_hash
-    db.commit()
+    await db.commit()
     
     return {"message": "Password changed successfully"}
 
 @app.post("/api/auth/change-email")
-async def change_email(request: ChangeEmailRequest, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == user["id"]).first()
+async def change_email(request: ChangeEmailRequest, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    db_user = await db.get(User, user["id"])
     db_user.email = request.newEmail
-    db.commit()
+    await db.commit()
     return {"message": "Email changed successfully"}
 
 @app.post("/api/auth/logout")
@@ -261,71 +666,86 @@ async def logout(response: Response, credentials: Optional[HTTPAuthorizationCred
         samesite="lax"
     )
     
-    # Remove token from active tokens if provided
+    # Revoke the token if provided; expired or forged tokens need no entry
     if credentials:
-        active_tokens.discard(credentials.credentials)
+        try:
+            payload = decode_token(SECRET_KEY, credentials.credentials)
+        except InvalidToken:
+            payload = None
+        if payload:
+            await revocation_store.revoke(payload["jti"], payload["exp"])
     
     return {"message": "Logged out successfully"}
 
 @app.post("/api/upload/image")
 async def upload_image(image: UploadFile = File(...), user: dict = Depends(verify_token)):
-    file_extension = image.filename.split('.')[-1]
-    unique_filename = f"blog-images/{uuid.uuid4()}.{file_extension}"
-    
+    # Returns the original URL plus resized WebP/AVIF variants and srcset strings
     try:
-        # Upload to S3
-        s3_client.upload_fileobj(
-            image.file,
-            S3_BUCKET,
-            unique_filename,
-            ExtraArgs={
-                'ACL': 'public-read',
-                'ContentType': image.content_type,
-                'CacheControl': 'max-age=31536000'
-            }
-        )
-        
-        # Return CloudFront URL if available, otherwise S3 URL
-        if CLOUDFRONT_DOMAIN:
-            image_url = f"https://{CLOUDFRONT_DOMAIN}/{unique_filename}"
-        else:
-            image_url = f"https://{S3_BUCKET}.s3.amazonaws.com/{unique_filename}"
-        
-        return {"url": image_url}
-        
+        return await media_pipeline.process(image)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"error": str(e)}
 
+# Singleton settings documents are stored as JSON text and served as-is
+async def load_document(db: AsyncSession, model, default: dict):
+    row = await db.scalar(select(model).order_by(model.id).limit(1))
+    if row:
+        return row.data.encode(), row.updated_at
+    return dumps(default), None
+
+def document_response(request: Request, entry, media_type: str = "application/json") -> Response:
+    if is_not_modified(request, entry.etag, entry.last_modified):
+        return not_modified(entry.etag, entry.last_modified, PUBLIC_CACHE_CONTROL)
+    encoding = compressed_cache.encoding_for(request)
+    cached = compressed_cache.get(entry.etag, encoding)
+    if cached:
+        return cached
+    response = Response(content=entry.body, media_type=media_type)
+    set_validators(response, entry.etag, entry.last_modified, PUBLIC_CACHE_CONTROL)
+    return compressed_cache.put(entry.etag, encoding, response)
+
 # Landing Page API
+# Default data if none exists
+DEFAULT_LANDING_DATA = {
+    "hero": {
+        "title": "FoxxTalk",
+        "subtitle": "A Blog for Every Conversation",
+        "backgroundColor": "#000000",
+        "show": True
+    },
+    "featuredPosts": {
+        "title": "Featured Posts",
+        "count": DEFAULT_FEATURED_POSTS,
+        "show": True
+    },
+    "sections": []
+}
+
+async def load_landing(db: AsyncSession):
+    # Landing document plus its featured post summaries, so the home page is one request
+    row = await db.scalar(select(LandingPage).order_by(LandingPage.id).limit(1))
+    data = json.loads(row.data) if row else dict(DEFAULT_LANDING_DATA)
+    rows = (await db.execute(
+        select(*summary_columns()).where(DBPost.published == True)
+        .order_by(DBPost.created_at.desc(), DBPost.id.desc()).limit(featured_count(data))
+    )).all()
+    data["featured"] = serialize_rows(rows, SUMMARY_FIELDS)
+    timestamps = [r.updated_at for r in rows] + ([row.updated_at] if row else [])
+    last_modified = max(timestamps, default=None)
+    return dumps(data), last_modified
+
 @app.get("/api/landing")
-async def get_landing_data(db: Session = Depends(get_db)):
-    landing = db.query(LandingPage).first()
-    if landing:
-        import json
-        return json.loads(landing.data)
-    
-    # Default data if none exists
-    return {
-        "hero": {
-            "title": "FoxxTalk",
-            "subtitle": "A Blog for Every Conversation",
-            "backgroundColor": "#000000",
-            "show": True
-        },
-        "featuredPosts": {
-            "title": "Featured Posts",
-            "count": 3,
-            "show": True
-        },
-        "sections": []
-    }
+async def get_landing_data(request: Request, db: AsyncSession = Depends(get_read_db)):
+    entry = await document_cache.get(db, "landing", load_landing)
+    return document_response(request, entry)
 
 @app.post("/api/landing")
-async def save_landing_data(data: LandingPageData, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    import json
-    
+async def save_landing_data(data: LandingPageData, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     # Check if landing page exists
-    landing = db.query(LandingPage).first()
+    landing = await db.scalar(select(LandingPage).order_by(LandingPage.id).limit(1))
     if landing:
         landing.data = json.dumps(data.dict())
         landing.updated_at = datetime.utcnow()
@@ -336,29 +756,28 @@ async def save_landing_data(data: LandingPageData, user: dict = Depends(verify_t
         )
         db.add(landing)
     
-    db.commit()
+    await bump_version(db, "landing")
+    await db.commit()
+    document_cache.invalidate("landing")
+    publisher.schedule("landing")
     return {"message": "Landing page saved successfully"}
 
 # Global Settings API
+# Default settings
+DEFAULT_GLOBAL_SETTINGS = {
+    "siteTitle": "SlyyFoxx Media",
+    "primaryColor": "#ff6b35",
+    "backgroundColor": "#000000"
+}
+
 @app.get("/api/global-settings")
-async def get_global_settings(db: Session = Depends(get_db)):
-    settings = db.query(GlobalSettings).first()
-    if settings:
-        import json
-        return json.loads(settings.data)
-    
-    # Default settings
-    return {
-        "siteTitle": "SlyyFoxx Media",
-        "primaryColor": "#ff6b35",
-        "backgroundColor": "#000000"
-    }
+async def get_global_settings(request: Request, db: AsyncSession = Depends(get_read_db)):
+    entry = await document_cache.get(db, "global-settings", lambda db: load_document(db, GlobalSettings, DEFAULT_GLOBAL_SETTINGS))
+    return document_response(request, entry)
 
 @app.post("/api/global-settings")
-async def save_global_settings(settings: dict, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    import json
-    
-    global_settings = db.query(GlobalSettings).first()
+async def save_global_settings(settings: dict, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    global_settings = await db.scalar(select(GlobalSettings).order_by(GlobalSettings.id).limit(1))
     if global_settings:
         global_settings.data = json.dumps(settings)
         global_settings.updated_at = datetime.utcnow()
@@ -369,76 +788,124 @@ async def save_global_settings(settings: dict, user: dict = Depends(verify_token
         )
         db.add(global_settings)
     
-    db.commit()
+    await bump_version(db, "global-settings")
+    await db.commit()
+    document_cache.invalidate("global-settings")
+    publisher.schedule("global-settings")
     return {"message": "Global settings saved successfully"}
 
 # Analytics API
+@app.post("/api/posts/{post_id}/view", status_code=204)
+async def record_view(post_id: int):
+    # Beacon target: buffered in memory, no database work on the request path
+    view_recorder.record(post_id)
+    return Response(status_code=204)
+
 @app.get("/api/analytics")
-async def get_analytics(db: Session = Depends(get_db)):
-    total_posts = db.query(DBPost).count()
-    # In production, you'd get real analytics data from Google Analytics API
-    return {
-        "totalPosts": total_posts,
-        "totalViews": total_posts * 150,  # Mock data
-        "monthlyViews": total_posts * 50   # Mock data
-    }
+async def get_analytics(user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    total_posts = await db.scalar(select(func.count(DBPost.id)))
+    return {"totalPosts": total_posts, **await view_summary(db)}
 
 # Delete Post API
 @app.delete("/api/posts/{post_id}")
-async def delete_post(post_id: int, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    post = db.query(DBPost).filter(DBPost.id == post_id).first()
+async def delete_post(post_id: int, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    post = await db.get(DBPost, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    db.delete(post)
-    db.commit()
+    # The posts trigger leaves a tombstone so /api/posts/changes reports the delete. Flushed before
+    # the version bumps so every writer takes the trigger's lock before the resource_versions rows.
+    await db.delete(post)
+    await db.flush()
+    await bump_version(db, "posts")
+    await bump_version(db, "landing")
+    await bump_feeds(db, [(post.id, post.category)])
+    await db.commit()
+    document_cache.invalidate("landing")
+    publisher.schedule("post", post_id)
     return {"message": "Post deleted successfully"}
 
 # Pages API
 @app.get("/api/pages/{slug}")
-async def get_page(slug: str, db: Session = Depends(get_db)):
-    from database import Page
-    page = db.query(Page).filter(Page.slug == slug, Page.published == True).first()
-    if not page:
+async def get_page(slug: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    updated_at = await db.scalar(select(Page.updated_at).where(Page.slug == slug, Page.published == True))
+    if updated_at is None:
         raise HTTPException(status_code=404, detail="Page not found")
-    
-    return {
-        "id": page.id,
-        "title": page.title,
-        "slug": page.slug,
-        "content": page.content,
-        "meta_description": page.meta_description,
-        "published": page.published,
-        "created_at": page.created_at.isoformat() + "Z",
-        "updated_at": page.updated_at.isoformat() + "Z"
-    }
+    etag = make_etag("page", slug, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at, PUBLIC_CACHE_CONTROL)
+    encoding = compressed_cache.encoding_for(request)
+    cached = compressed_cache.get(etag, encoding)
+    if cached:
+        return cached
+
+    row = (await db.execute(select(*PAGE_FIELDS.values()).where(Page.slug == slug, Page.published == True))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Page not found")
+    page = dict(zip(PAGE_FIELDS, row))
+    etag = make_etag("page", slug, page["updated_at"])
+    response = FastJSONResponse(page)
+    set_validators(response, etag, page["updated_at"], PUBLIC_CACHE_CONTROL)
+    return compressed_cache.put(etag, encoding, response)
+
+# Sitemap and feeds: pre-encoded XML rebuilt only when the post set they list changes
+@app.get("/sitemap.xml")
+async def get_sitemap(request: Request, db: AsyncSession = Depends(get_read_db)):
+    entry = await document_cache.get(db, "sitemap", lambda db: load_sitemap(db, SITE_URL))
+    return document_response(request, entry, "application/xml")
+
+@app.get("/sitemaps/pages.xml")
+async def get_page_sitemap(request: Request, db: AsyncSession = Depends(get_read_db)):
+    entry = await document_cache.get(db, "sitemap:pages", lambda db: load_page_sitemap(db, SITE_URL))
+    return document_response(request, entry, "application/xml")
+
+@app.get("/sitemaps/posts-{shard}.xml")
+async def get_post_sitemap(shard: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    # Checked first so arbitrary shard numbers cannot fill the document cache
+    if shard < 1 or not await shard_exists(db, shard):
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    name = f"sitemap:posts-{shard}"
+    entry = await document_cache.get(db, name, lambda db: load_post_sitemap(db, SITE_URL, shard))
+    return document_response(request, entry, "application/xml")
+
+@app.get("/feeds/{fmt}.xml")
+async def get_feed(fmt: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    if fmt not in FEED_FORMATS:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    entry = await document_cache.get(db, f"feeds/{fmt}", lambda db: load_feed(db, SITE_URL, SITE_NAME, fmt), "feeds")
+    return document_response(request, entry, FEED_FORMATS[fmt][1])
+
+@app.get("/feeds/{category}/{fmt}.xml")
+async def get_category_feed(category: str, fmt: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    if fmt not in FEED_FORMATS or not await category_exists(db, category):
+        raise HTTPException(status_code=404, detail="Feed not found")
+    entry = await document_cache.get(
+        db, f"feeds/{category}/{fmt}", lambda db: load_feed(db, SITE_URL, SITE_NAME, fmt, category), f"feeds:{category}"
+    )
+    return document_response(request, entry, FEED_FORMATS[fmt][1])
 
 # Blog Settings API
+# Default settings
+DEFAULT_BLOG_SETTINGS = {
+    "headerTitle": "FoxxTalk Blog",
+    "headerSubtitle": "Latest insights and updates",
+    "backgroundColor": "#000000",
+    "postsPerPage": 12,
+    "showSearch": True,
+    "showCategories": True,
+    "categories": "general,tech,media,creative,business",
+    "showPagination": True,
+    "paginationStyle": "numbers"
+}
+
 @app.get("/api/blog-settings")
-async def get_blog_settings(db: Session = Depends(get_db)):
-    settings = db.query(BlogSettings).first()
-    if settings:
-        import json
-        return json.loads(settings.data)
-    
-    # Default settings
-    return {
-        "headerTitle": "FoxxTalk Blog",
-        "headerSubtitle": "Latest insights and updates",
-        "backgroundColor": "#000000",
-        "postsPerPage": 12,
-        "showSearch": True,
-        "showCategories": True,
-        "categories": "general,tech,media,creative,business",
-        "showPagination": True,
-        "paginationStyle": "numbers"
-    }
+async def get_blog_settings(request: Request, db: AsyncSession = Depends(get_read_db)):
+    entry = await document_cache.get(db, "blog-settings", lambda db: load_document(db, BlogSettings, DEFAULT_BLOG_SETTINGS))
+    return document_response(request, entry)
 
 @app.post("/api/blog-settings")
-async def save_blog_settings(settings: dict, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    import json
-    
-    blog_settings = db.query(BlogSettings).first()
+async def save_blog_settings(settings: dict, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    blog_settings = await db.scalar(select(BlogSettings).order_by(BlogSettings.id).limit(1))
     if blog_settings:
         blog_settings.data = json.dumps(settings)
         blog_settings.updated_at = datetime.utcnow()
@@ -449,87 +916,96 @@ async def save_blog_settings(settings: dict, user: dict = Depends(verify_token),
         )
         db.add(blog_settings)
     
-    db.commit()
+    await bump_version(db, "blog-settings")
+    await db.commit()
+    document_cache.invalidate("blog-settings")
+    publisher.schedule("blog-settings")
     return {"message": "Blog settings saved successfully"}
 
+if PUBLISH_TARGET == 'local':
+    snapshot_store = LocalSnapshotStore(PUBLISH_LOCAL_ROOT)
+elif PUBLISH_TARGET == 's3':
+    snapshot_store = S3SnapshotStore(s3_client, S3_BUCKET, PUBLISH_S3_PREFIX)
+else:
+    snapshot_store = None
+publisher = Publisher(snapshot_store, documents={
+    "landing": load_landing,
+    "global-settings": lambda db: load_document(db, GlobalSettings, DEFAULT_GLOBAL_SETTINGS),
+    "blog-settings": lambda db: load_document(db, BlogSettings, DEFAULT_BLOG_SETTINGS),
+})
+
 # AI Generation API
-@app.post("/api/ai/generate")
-async def generate_with_ai(request: dict, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    # Get Gemini API key from global settings
-    settings = db.query(GlobalSettings).first()
-    if not settings:
-        raise HTTPException(status_code=400, detail="Global settings not configured")
-    
-    import json
-    settings_data = json.loads(settings.data)
-    gemini_api_key = settings_data.get('geminiApiKey')
-    
-    if not gemini_api_key:
+async def gemini_api_key(db: AsyncSession) -> str:
+    entry = await document_cache.get(
+        db, "global-settings", lambda db: load_document(db, GlobalSettings, DEFAULT_GLOBAL_SETTINGS)
+    )
+    api_key = entry.data.get('geminiApiKey')
+    if not api_key:
         raise HTTPException(status_code=400, detail="Gemini API key not configured")
-    
-    prompt_type = request.get('prompt')
-    current_data = request.get('currentData', {})
-    
+    return api_key
+
+def submit_ai_job(user: dict, kind: str, prompt: str, current_data: dict, api_key: str):
     try:
-        # Mock response for now - replace with actual Gemini API call
-        if prompt_type == 'generate_title':
-            return {
-                "title": "AI-Generated: The Future of Digital Innovation"
-            }
-        elif prompt_type == 'generate_category':
-            return {
-                "category": "technology"
-            }
-        elif prompt_type == 'generate_tags':
-            return {
-                "tags": "ai, innovation, digital, future, technology"
-            }
-        elif prompt_type == 'generate_content':
-            return {
-                "content": "Digital innovation is transforming how we work, communicate, and live. From artificial intelligence to blockchain technology, we're witnessing unprecedented changes that will shape the next decade.\n\nKey trends include:\n- AI-powered automation\n- Sustainable technology solutions\n- Enhanced user experiences\n- Data-driven decision making\n\nThese developments present both opportunities and challenges for businesses and individuals alike."
-            }
-        elif prompt_type == 'generate_image':
-            # Generate image based on post title/content
-            title = current_data.get('title', 'blog post')
-            return {
-                "image": f"https://picsum.photos/400/200?random={hash(title) % 1000}"
-            }
-        else:
-            return {"message": "AI generation completed"}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
+        return ai_jobs.submit(user["id"], kind, prompt, current_data, api_key)
+    except JobRejected as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+def ai_job_result(job):
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"AI generation failed: {job.error}")
+    if job.status != "done":
+        raise HTTPException(status_code=504, detail="AI generation is still running", headers={"Location": f"/api/ai/jobs/{job.id}"})
+    return job.result
+
+@app.post("/api/ai/jobs", status_code=202)
+async def create_ai_job(request: dict, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    kind = request.get('kind', 'text')
+    if kind not in ('text', 'image'):
+        raise HTTPException(status_code=400, detail="kind must be 'text' or 'image'")
+    prompt = request.get('prompt', '')
+    if not prompt:
+        raise HTTPException(status_code=400, detail="Prompt is required")
+    job = submit_ai_job(user, kind, prompt, request.get('currentData', {}), await gemini_api_key(db))
+    return job.to_dict()
+
+@app.get("/api/ai/jobs/{job_id}")
+async def get_ai_job(job_id: str, wait: float = Query(0, ge=0, le=30), user: dict = Depends(verify_token)):
+    # wait > 0 long-polls until the job finishes or the wait elapses
+    job = ai_jobs.get(job_id, user["id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait:
+        await job.wait(wait)
+    return job.to_dict()
+
+@app.get("/api/ai/jobs/{job_id}/events")
+async def stream_ai_job(job_id: str, user: dict = Depends(verify_token)):
+    job = ai_jobs.get(job_id, user["id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        yield f"data: {json.dumps(job.to_dict())}\n\n"
+        while not await job.wait(15):
+            yield ": keep-alive\n\n"
+        yield f"data: {json.dumps(job.to_dict())}\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream", headers=EVENT_STREAM_HEADERS)
+
+# Synchronous wrappers kept for the admin UI: submit, then wait for the job
+@app.post("/api/ai/generate")
+async def generate_with_ai(request: dict, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
+    job = submit_ai_job(user, "text", request.get('prompt') or '', request.get('currentData', {}), await gemini_api_key(db))
+    await job.wait(AI_JOB_TIMEOUT)
+    return ai_job_result(job)
 
 @app.post("/api/ai/generate-image")
-async def generate_ai_image(request: dict, user: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    # Get Gemini API key from global settings
-    settings = db.query(GlobalSettings).first()
-    if not settings:
-        raise HTTPException(status_code=400, detail="Global settings not configured")
-    
-    import json
-    settings_data = json.loads(settings.data)
-    gemini_api_key = settings_data.get('geminiApiKey')
-    
-    if not gemini_api_key:
-        raise HTTPException(status_code=400, detail="Gemini API key not configured")
-    
+async def generate_ai_image(request: dict, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     prompt = request.get('prompt', '')
     if not prompt:
         raise HTTPException(status_code=400, detail="Image prompt is required")
-    
-    try:
-        # Mock response for now - replace with actual AI image generation
-        # You can integrate with DALL-E, Midjourney, or Stable Diffusion APIs
-        image_url = f"https://picsum.photos/800/400?random={hash(prompt) % 10000}"
-        
-        return {
-            "imageUrl": image_url,
-            "prompt": prompt
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI image generation failed: {str(e)}")
+    job = submit_ai_job(user, "image", prompt, {}, await gemini_api_key(db))
+    await job.wait(AI_JOB_TIMEOUT)
+    return ai_job_result(job)
 
 if __name__ == "__main__":
     import uvicorn
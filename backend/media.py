@@ -0,0 +1,185 @@
+import asyncio
+import functools
+import hashlib
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Variant name -> target width; images are never upscaled
+VARIANT_WIDTHS = {"thumbnail": 320, "card": 800, "hero": 1600}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class UploadTooLarge(Exception):
+    pass
+
+class InvalidImage(Exception):
+    pass
+
+class S3Storage:
+    def __init__(self, client_factory, bucket: str, cloudfront_domain: str = None):
+        # client_factory() returns the boto3 client; it is only called once a file is stored or read
+        self.client_factory = client_factory
+        self.bucket = bucket
+        self.cloudfront_domain = cloudfront_domain
+
+    @property
+    def client(self):
+        return self.client_factory()
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError:
+            return False
+
+    def read(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def put_file(self, key: str, file, content_type: str):
+        self.client.upload_fileobj(file, self.bucket, key, ExtraArgs={
+            'ACL': 'public-read',
+            'ContentType': content_type,
+            'CacheControl': IMMUTABLE_CACHE_CONTROL
+        })
+
+    def put_bytes(self, key: str, data: bytes, content_type: str):
+        self.client.put_object(
+            Bucket=self.bucket, Key=key, Body=data, ACL='public-read',
+            ContentType=content_type, CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+
+    def url(self, key: str) -> str:
+        # Return CloudFront URL if available, otherwise S3 URL
+        if self.cloudfront_domain:
+            return f"https://{self.cloudfront_domain}/{key}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+class LocalStorage:
+    """Filesystem stand-in for S3, used in tests and local development."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def read(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def put_file(self, key: str, file, content_type: str):
+        os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+        with open(self._path(key), "wb") as f:
+            shutil.copyfileobj(file, f)
+
+    def put_bytes(self, key: str, data: bytes, content_type: str):
+        os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+        with open(self._path(key), "wb") as f:
+            f.write(data)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+@functools.lru_cache(maxsize=None)
+def variant_formats() -> dict:
+    # Pillow is imported and probed for AVIF on the first upload, not while the worker boots
+    from PIL import features
+    formats = {"webp": ("WEBP", "image/webp", {"quality": 80, "method": 4})}
+    if features.check("avif"):
+        formats["avif"] = ("AVIF", "image/avif", {"quality": 60})
+    return formats
+
+def hash_upload(file, max_bytes: int = None) -> str:
+    # Starlette has already spooled the body, so it is read in place, in chunks
+    digest, size = hashlib.sha256(), 0
+    file.seek(0)
+    while chunk := file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise UploadTooLarge(f"Uploads are limited to {max_bytes} bytes")
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def verify_image(file):
+    from PIL import Image, UnidentifiedImageError
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            image.verify()
+    except (UnidentifiedImageError, SyntaxError, OSError) as e:
+        raise InvalidImage("Not a supported image") from e
+
+def build_variants(storage, file, prefix: str) -> dict:
+    """Resize the original into every variant and format, upload them and
+    return the srcset manifest. Runs on the media worker pool."""
+    from PIL import Image, ImageOps
+    formats = variant_formats()
+    file.seek(0)
+    with Image.open(file) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        width, height = image.size
+
+        variants = {}
+        srcset = {fmt: [] for fmt in formats}
+        for name, target in VARIANT_WIDTHS.items():
+            variant_width = min(target, width)
+            variant_height = round(height * variant_width / width)
+            resized = image if variant_width == width else image.resize((variant_width, variant_height), Image.LANCZOS)
+            variants[name] = {"width": variant_width, "height": variant_height}
+            for fmt, (pil_format, content_type, options) in formats.items():
+                key = f"{prefix}/{name}.{fmt}"
+                buffer = io.BytesIO()
+                resized.save(buffer, pil_format, **options)
+                storage.put_bytes(key, buffer.getvalue(), content_type)
+                variants[name][fmt] = storage.url(key)
+                srcset[fmt].append(f"{storage.url(key)} {variant_width}w")
+
+    return {
+        "width": width,
+        "height": height,
+        "variants": variants,
+        "srcset": {fmt: ", ".join(entries) for fmt, entries in srcset.items()},
+    }
+
+class MediaPipeline:
+    def __init__(self, storage, workers: int = 2, max_bytes: int = None):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+
+    async def process(self, upload) -> dict:
+        # upload.size is known once Starlette has parsed the form; the hash pass enforces the cap either way
+        if self.max_bytes and (upload.size or 0) > self.max_bytes:
+            raise UploadTooLarge(f"Uploads are limited to {self.max_bytes} bytes")
+        file = upload.file
+        digest = await asyncio.to_thread(hash_upload, file, self.max_bytes)
+        extension = os.path.splitext(upload.filename or "")[1].lower().lstrip(".") or "bin"
+        prefix = f"blog-images/{digest[:32]}"
+        manifest_key = f"{prefix}/manifest.json"
+
+        # Same bytes, same key: re-uploads reuse the stored manifest
+        if await asyncio.to_thread(self.storage.exists, manifest_key):
+            return json.loads(await asyncio.to_thread(self.storage.read, manifest_key))
+
+        await asyncio.to_thread(verify_image, file)
+        original_key = f"{prefix}/original.{extension}"
+        file.seek(0)
+        await asyncio.to_thread(self.storage.put_file, original_key, file, upload.content_type)
+        loop = asyncio.get_running_loop()
+        manifest = await loop.run_in_executor(self.pool, build_variants, self.storage, file, prefix)
+        manifest = {"url": self.storage.url(original_key), "hash": digest, **manifest}
+        await asyncio.to_thread(
+            self.storage.put_bytes, manifest_key, json.dumps(manifest).encode(), "application/json"
+        )
+        return manifest
@@ -0,0 +1,53 @@
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled database connection",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds", "Database statement execution time", ["statement"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+# Labelled by route template, never the raw path, so cardinality stays bounded
+HTTP_REQUESTS_TOTAL = Counter("http_requests_total", "HTTP requests handled", ["method", "route", "status"])
+HTTP_REQUEST_ERRORS_TOTAL = Counter("http_request_errors_total", "HTTP requests that failed with a 5xx or an exception", ["method", "route"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+DB_REPLICA_LAG_SECONDS = Gauge("db_replica_lag_seconds", "Replication lag of each read replica at its last health check", ["replica"])
+DB_REPLICA_HEALTHY = Gauge("db_replica_healthy", "1 if the read replica passed its last health check", ["replica"])
+DB_READS_TOTAL = Counter("db_read_sessions_total", "Read-only sessions by the database they were routed to", ["target"])
+ANALYTICS_VIEWS_DROPPED = Counter("analytics_views_dropped_total", "Post views discarded because the ingest buffer was full")
+COMPRESSION_CACHE_HITS = Counter("compression_cache_hits_total", "Responses served from the precompressed body cache", ["encoding"])
+COMPRESSION_CACHE_MISSES = Counter("compression_cache_misses_total", "Responses compressed because the cache had no entry", ["encoding"])
+COMPRESSION_CACHE_BYTES = Gauge("compression_cache_bytes", "Compressed bytes held by the response cache")
+
+class PoolCollector:
+    """Reads connection counts off each registered QueuePool at scrape time."""
+
+    def __init__(self):
+        self.pools = {}
+
+    def collect(self):
+        connections = GaugeMetricFamily("db_pool_connections", "Pooled database connections by state", labels=["pool", "state"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["pool"])
+        for name, pool in self.pools.items():
+            connections.add_metric([name, "checked_out"], pool.checkedout())
+            connections.add_metric([name, "idle"], pool.checkedin())
+            connections.add_metric([name, "overflow"], max(pool.overflow(), 0))
+            size.add_metric([name], pool.size())
+        yield connections
+        yield size
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+def register_pool(name: str, pool):
+    pool_collector.pools[name] = pool
+
+def render_metrics():
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,81 @@
+"""Baseline: the schema create_all produced before migrations existed
+
+Existing databases already have these tables; mark them with
+`alembic stamp 0001` before the first `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def document_table(name: str):
+    op.create_table(
+        name,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('data', sa.Text()),
+        sa.Column('user_id', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index(f'ix_{name}_id', name, ['id'])
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('email', sa.String()),
+        sa.Column('password_hash', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'posts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String()),
+        sa.Column('content', sa.Text()),
+        sa.Column('category', sa.String()),
+        sa.Column('tags', sa.String()),
+        sa.Column('image', sa.String()),
+        sa.Column('author', sa.String()),
+        sa.Column('author_image', sa.String()),
+        sa.Column('published', sa.Boolean()),
+        sa.Column('user_id', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_posts_id', 'posts', ['id'])
+    op.create_index('ix_posts_title', 'posts', ['title'])
+
+    op.create_table(
+        'pages',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String()),
+        sa.Column('slug', sa.String()),
+        sa.Column('content', sa.Text()),
+        sa.Column('meta_description', sa.String()),
+        sa.Column('published', sa.Boolean()),
+        sa.Column('user_id', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_pages_id', 'pages', ['id'])
+    op.create_index('ix_pages_title', 'pages', ['title'])
+    op.create_index('ix_pages_slug', 'pages', ['slug'], unique=True)
+
+    document_table('landing_pages')
+    document_table('blog_settings')
+    document_table('global_settings')
+
+def downgrade() -> None:
+    for name in ('global_settings', 'blog_settings', 'landing_pages', 'pages', 'posts', 'users'):
+        op.drop_table(name)
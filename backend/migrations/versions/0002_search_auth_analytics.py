@@ -0,0 +1,105 @@
+"""Search, tags, cache versions, token revocation, bulk import and view analytics
+
+Replaces migrate_search.py. Written with IF NOT EXISTS because databases
+that ran the app before migrations existed got some of this from
+create_all.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPGRADE = [
+    """
+    ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING gin (search_vector)",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS external_id varchar",
+    "CREATE UNIQUE INDEX IF NOT EXISTS posts_external_id_key ON posts (external_id)",
+    """
+    CREATE TABLE IF NOT EXISTS post_tags (
+        post_id integer NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+        tag varchar NOT NULL,
+        PRIMARY KEY (post_id, tag)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_post_tags_tag ON post_tags (tag)",
+    """
+    INSERT INTO post_tags (post_id, tag)
+    SELECT DISTINCT posts.id, lower(trim(t.tag))
+    FROM posts, unnest(string_to_array(posts.tags, ',')) AS t(tag)
+    WHERE trim(t.tag) <> ''
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resource_versions (
+        name varchar PRIMARY KEY,
+        version integer NOT NULL,
+        updated_at timestamp
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        jti varchar PRIMARY KEY,
+        expires_at timestamp
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at ON revoked_tokens (expires_at)",
+    """
+    CREATE TABLE IF NOT EXISTS post_views (
+        id bigserial PRIMARY KEY,
+        post_id integer NOT NULL,
+        viewed_at timestamp NOT NULL,
+        ingested_at timestamp NOT NULL DEFAULT (now() at time zone 'utc')
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_post_views_ingested_at ON post_views (ingested_at)",
+    """
+    CREATE TABLE IF NOT EXISTS post_views_hourly (
+        post_id integer NOT NULL,
+        hour timestamp NOT NULL,
+        views bigint NOT NULL,
+        PRIMARY KEY (post_id, hour)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS post_views_daily (
+        post_id integer NOT NULL,
+        day date NOT NULL,
+        views bigint NOT NULL,
+        PRIMARY KEY (post_id, day)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_post_views_daily_day ON post_views_daily (day)",
+    """
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        name varchar PRIMARY KEY,
+        rolled_up_to timestamp NOT NULL
+    )
+    """,
+]
+
+def upgrade() -> None:
+    for statement in UPGRADE:
+        op.execute(statement)
+
+def downgrade() -> None:
+    for table in ('rollup_state', 'post_views_daily', 'post_views_hourly', 'post_views', 'revoked_tokens', 'resource_versions', 'post_tags'):
+        op.drop_table(table)
+    op.drop_index('posts_external_id_key', table_name='posts')
+    op.drop_column('posts', 'external_id')
+    op.drop_index('ix_posts_search_vector', table_name='posts')
+    op.drop_column('posts', 'search_vector')
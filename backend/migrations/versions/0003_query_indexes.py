@@ -0,0 +1,42 @@
+"""Indexes for the public read paths
+
+Partial indexes cover only published posts, which is all the public
+endpoints read:
+- ix_posts_published_feed: newest-first listing and its keyset cursor
+- ix_posts_published_category: category filter in search, newest first
+- ix_posts_published_updated_at: max(updated_at) for the listing ETag
+
+Built CONCURRENTLY so upgrading a live database does not block writes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_posts_published_feed': [sa.text('created_at DESC'), sa.text('id DESC')],
+    'ix_posts_published_category': ['category', sa.text('created_at DESC'), sa.text('id DESC')],
+    'ix_posts_published_updated_at': ['updated_at'],
+}
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name, 'posts', columns, postgresql_where=sa.text('published'),
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='posts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,35 @@
+"""Derived post fields: rendered HTML, excerpt, word count, reading time, first image
+
+The app fills these on every write. Adding nullable columns without a
+default does not rewrite the table; existing rows stay NULL until
+`python backfill.py` renders them.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('content_html', sa.Text()),
+    ('excerpt', sa.String()),
+    ('word_count', sa.Integer()),
+    ('reading_minutes', sa.Integer()),
+    ('first_image', sa.String()),
+]
+
+def upgrade() -> None:
+    for name, type_ in COLUMNS:
+        op.add_column('posts', sa.Column(name, type_, nullable=True))
+
+def downgrade() -> None:
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('posts', name)
@@ -0,0 +1,80 @@
+"""Change sequence and tombstones for post delta sync
+
+Every insert, update or delete on posts takes the next value of
+post_change_seq, set by a trigger so bulk imports and scripts are covered
+as well as the ORM. Deletes leave a row in post_tombstones. The trigger
+holds a transaction-level advisory lock until commit, so sequence values
+become visible in order and a reader polling `change_seq > cursor` never
+skips a slower writer. It also sends a NOTIFY on post_changes for the
+change stream.
+
+Existing rows are numbered in updated_at order, which rewrites posts once.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPGRADE = [
+    "CREATE SEQUENCE post_change_seq",
+    "ALTER TABLE posts ADD COLUMN change_seq bigint",
+    """
+    UPDATE posts SET change_seq = numbered.seq
+    FROM (
+        SELECT id, nextval('post_change_seq') AS seq
+        FROM (SELECT id FROM posts ORDER BY updated_at, id) AS ordered
+    ) AS numbered
+    WHERE posts.id = numbered.id
+    """,
+    "ALTER TABLE posts ALTER COLUMN change_seq SET NOT NULL",
+    "CREATE UNIQUE INDEX ix_posts_change_seq ON posts (change_seq)",
+    """
+    CREATE TABLE post_tombstones (
+        post_id integer PRIMARY KEY,
+        change_seq bigint NOT NULL,
+        deleted_at timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+    )
+    """,
+    "CREATE UNIQUE INDEX ix_post_tombstones_change_seq ON post_tombstones (change_seq)",
+    """
+    CREATE FUNCTION posts_track_change() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('post_changes'));
+        -- Identical payloads are folded into one notification per transaction
+        PERFORM pg_notify('post_changes', '');
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO post_tombstones (post_id, change_seq) VALUES (OLD.id, nextval('post_change_seq'))
+            ON CONFLICT (post_id) DO UPDATE SET change_seq = EXCLUDED.change_seq, deleted_at = EXCLUDED.deleted_at;
+            RETURN OLD;
+        END IF;
+        NEW.change_seq := nextval('post_change_seq');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER posts_track_change BEFORE INSERT OR UPDATE OR DELETE ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_track_change()
+    """,
+]
+
+def upgrade() -> None:
+    for statement in UPGRADE:
+        op.execute(statement)
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER posts_track_change ON posts")
+    op.execute("DROP FUNCTION posts_track_change()")
+    op.drop_table('post_tombstones')
+    op.drop_index('ix_posts_change_seq', table_name='posts')
+    op.drop_column('posts', 'change_seq')
+    op.execute("DROP SEQUENCE post_change_seq")
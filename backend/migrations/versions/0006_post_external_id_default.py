@@ -0,0 +1,48 @@
+"""Give every post an external id
+
+Posts created through the API had a NULL external_id, so an export of them
+could not be imported back onto the same rows. A trigger now fills
+"post-<id>" on insert when no external id is given, and existing rows get
+the same value, which makes the column NOT NULL.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPGRADE = [
+    """
+    CREATE FUNCTION posts_default_external_id() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.external_id IS NULL THEN
+            NEW.external_id := 'post-' || NEW.id;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER posts_default_external_id BEFORE INSERT ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_default_external_id()
+    """,
+    "UPDATE posts SET external_id = 'post-' || id WHERE external_id IS NULL",
+    "ALTER TABLE posts ALTER COLUMN external_id SET NOT NULL",
+]
+
+def upgrade() -> None:
+    for statement in UPGRADE:
+        op.execute(statement)
+
+def downgrade() -> None:
+    op.alter_column('posts', 'external_id', nullable=True)
+    op.execute("DROP TRIGGER posts_default_external_id ON posts")
+    op.execute("DROP FUNCTION posts_default_external_id()")
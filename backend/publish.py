@@ -0,0 +1,205 @@
+"""Publish-time JSON snapshots of the public site.
+
+Admin writes schedule the snapshots that depend on them; a background task
+re-renders only those and writes them to disk or S3, where nginx/CloudFront
+can serve them without touching Python. Run this module to rebuild
+everything:
+
+    PUBLISH_TARGET=local python publish.py
+"""
+import asyncio
+import json
+import logging
+import os
+from sqlalchemy import select, func
+from database import AsyncSessionLocal, Post, Page, LandingPage
+from serializers import DETAIL_FIELDS, SUMMARY_FIELDS, PAGE_FIELDS, dumps, featured_count, post_columns, summary_columns, serialize_rows
+
+logger = logging.getLogger("foxxtalk.publish")
+
+SNAPSHOT_PAGE_SIZE = 12
+SNAPSHOT_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+# Change kind -> snapshots it invalidates; "posts/pages" is every listing page
+DEPENDENCIES = {
+    "post": ["posts/{key}", "posts/pages", "posts/featured", "landing"],
+    "page": ["pages/{key}"],
+    "landing": ["landing", "posts/featured"],
+    "global-settings": ["global-settings"],
+    "blog-settings": ["blog-settings"],
+}
+
+class LocalSnapshotStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *f"{name}.json".split("/"))
+
+    def read(self, name: str):
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, body: bytes):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so nginx never serves a half-written file
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+
+    def delete(self, name: str):
+        try:
+            os.unlink(self._path(name))
+        except FileNotFoundError:
+            pass
+
+class S3SnapshotStore:
+    def __init__(self, client_factory, bucket: str, prefix: str):
+        self.client_factory = client_factory
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    @property
+    def client(self):
+        return self.client_factory()
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}/{name}.json"
+
+    def read(self, name: str):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(name))["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def write(self, name: str, body: bytes):
+        self.client.put_object(
+            Bucket=self.bucket, Key=self._key(name), Body=body, ACL='public-read',
+            ContentType="application/json", CacheControl=SNAPSHOT_CACHE_CONTROL
+        )
+
+    def delete(self, name: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+class Publisher:
+    def __init__(self, store, documents: dict, session_factory=AsyncSessionLocal):
+        # documents: snapshot name -> loader(db) returning (body bytes, last modified)
+        self.store = store
+        self.documents = documents
+        self.session_factory = session_factory
+        self.pending = set()
+        self._task = None
+
+    def schedule(self, kind: str, key=None):
+        if self.store is None:
+            return
+        self.pending.update(template.format(key=key) for template in DEPENDENCIES[kind])
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    def schedule_many(self, kind: str, keys):
+        for key in keys:
+            self.schedule(kind, key)
+
+    async def wait(self):
+        if self._task is not None:
+            await self._task
+
+    async def _drain(self):
+        # Targets scheduled while rendering are picked up by the next pass
+        while self.pending:
+            targets, self.pending = self.pending, set()
+            async with self.session_factory() as db:
+                for target in sorted(targets):
+                    try:
+                        await self.render(db, target)
+                    except Exception:
+                        logger.exception("Snapshot %s failed", target)
+
+    async def _write(self, name: str, data):
+        await asyncio.to_thread(self.store.write, name, dumps(data))
+
+    async def render(self, db, target: str):
+        if target in self.documents:
+            body, _ = await self.documents[target](db)
+            await asyncio.to_thread(self.store.write, target, body)
+        elif target == "posts/pages":
+            await self.render_listing(db)
+        elif target == "posts/featured":
+            await self.render_featured(db)
+        elif target.startswith("posts/"):
+            post_id = int(target.split("/", 1)[1])
+            row = (await db.execute(select(*post_columns(DETAIL_FIELDS)).where(Post.id == post_id, Post.published == True))).first()
+            if row:
+                await self._write(target, dict(zip(DETAIL_FIELDS, row)))
+            else:
+                await asyncio.to_thread(self.store.delete, target)
+        elif target.startswith("pages/"):
+            slug = target.split("/", 1)[1]
+            row = (await db.execute(select(*PAGE_FIELDS.values()).where(Page.slug == slug, Page.published == True))).first()
+            if row:
+                await self._write(target, dict(zip(PAGE_FIELDS, row)))
+            else:
+                await asyncio.to_thread(self.store.delete, target)
+        else:
+            raise ValueError(f"Unknown snapshot: {target}")
+
+    async def render_listing(self, db):
+        total = await db.scalar(select(func.count(Post.id)).where(Post.published == True))
+        total_pages = max(1, -(-total // SNAPSHOT_PAGE_SIZE))
+        previous = await asyncio.to_thread(self.store.read, "posts/index")
+        previous_pages = json.loads(previous)["totalPages"] if previous else 0
+
+        rows = await db.stream(
+            select(*summary_columns()).where(Post.published == True)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+        )
+        files = {}
+        async for partition in rows.partitions(SNAPSHOT_PAGE_SIZE):
+            page = len(files) + 1
+            files[f"posts/page-{page}"] = {
+                "posts": serialize_rows(partition, SUMMARY_FIELDS), "page": page, "totalPages": total_pages, "total": total
+            }
+        if not files:
+            files["posts/page-1"] = {"posts": [], "page": 1, "totalPages": total_pages, "total": total}
+        files["posts/index"] = {"totalPages": total_pages, "total": total, "pageSize": SNAPSHOT_PAGE_SIZE}
+        stale = [f"posts/page-{n}" for n in range(total_pages + 1, previous_pages + 1)]
+        # One thread hop for the whole listing rather than one per page
+        await asyncio.to_thread(self._write_listing, files, stale)
+
+    def _write_listing(self, files: dict, stale: list):
+        for name, data in files.items():
+            self.store.write(name, dumps(data))
+        for name in stale:
+            self.store.delete(name)
+
+    async def render_featured(self, db):
+        landing = await db.scalar(select(LandingPage).order_by(LandingPage.id).limit(1))
+        data = json.loads(landing.data) if landing else {}
+        rows = await db.execute(
+            select(*summary_columns()).where(Post.published == True)
+            .order_by(Post.created_at.desc(), Post.id.desc()).limit(featured_count(data))
+        )
+        await self._write("posts/featured", serialize_rows(rows, SUMMARY_FIELDS))
+
+    async def rebuild_all(self):
+        async with self.session_factory() as db:
+            post_ids = (await db.scalars(select(Post.id).where(Post.published == True))).all()
+            slugs = (await db.scalars(select(Page.slug).where(Page.published == True))).all()
+        self.pending.update(self.documents)
+        self.pending.update({"posts/pages", "posts/featured"})
+        self.pending.update(f"posts/{post_id}" for post_id in post_ids)
+        self.pending.update(f"pages/{slug}" for slug in slugs)
+        await self._drain()
+
+if __name__ == "__main__":
+    from main import publisher
+    if publisher.store is None:
+        raise SystemExit("Set PUBLISH_TARGET to 'local' or 's3' to publish snapshots")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(publisher.rebuild_all())
+    logger.info("Snapshots rebuilt")
@@ -0,0 +1,131 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("foxxtalk.ratelimit")
+
+UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class Rate:
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self.per_second = limit / period
+
+def parse_rate(value: str) -> Rate:
+    # "5/minute", "100/second" or "30/90" (requests per that many seconds)
+    count, _, period = value.partition("/")
+    seconds = UNITS[period] if period in UNITS else float(period)
+    return Rate(int(count), seconds)
+
+class RateLimitResult:
+    def __init__(self, allowed: bool, limit: int, remaining: float, retry_after: float):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = max(int(remaining), 0)
+        self.retry_after = math.ceil(retry_after)
+
+    def headers(self) -> dict:
+        headers = {"X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": str(self.remaining)}
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+def take_token(tokens: float, elapsed: float, rate: Rate):
+    # Token bucket: refill for the time since the last hit, then spend one token
+    tokens = min(rate.limit, tokens + elapsed * rate.per_second)
+    if tokens >= 1:
+        return True, tokens - 1
+    return False, tokens
+
+class MemoryRateLimiter:
+    """Per-process token buckets, used in tests and single-worker deployments.
+
+    Buckets are kept in least-recently-hit order, so pruning only looks at
+    the oldest end and each hit stays O(1) however many clients are active.
+    Past max_keys the least recently seen client loses its bucket.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        now = time.monotonic()
+        tokens, last, _ = self._buckets.pop(key, (rate.limit, now, now))
+        allowed, tokens = take_token(tokens, now - last, rate)
+        self._buckets[key] = (tokens, now, now + (rate.limit - tokens) / rate.per_second)
+        self._prune(now)
+        retry_after = 0 if allowed else (1 - tokens) / rate.per_second
+        return RateLimitResult(allowed, rate.limit, tokens, retry_after)
+
+    def _prune(self, now: float):
+        # A bucket that has refilled is indistinguishable from a missing one. Each bucket is
+        # removed at most once per insert, so this is amortized O(1).
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if oldest[2] > now and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+# Runs atomically in Redis with the server clock, so every worker shares one bucket per key
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local last = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * per_second)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / per_second) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisRateLimiter:
+    """Token buckets shared by every worker through Redis.
+
+    One EVALSHA round trip per request. If Redis is unreachable requests
+    are allowed through rather than failing the whole site, and the failure
+    is logged at most once per error_log_interval seconds.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:", error_log_interval: float = 60.0):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.error_log_interval = error_log_interval
+        self._errors = 0
+        self._error_logged_at = None
+
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        try:
+            allowed, tokens = await self.script(keys=[self.prefix + key], args=[rate.limit, rate.per_second])
+        except Exception as e:
+            self._log_error(e)
+            return RateLimitResult(True, rate.limit, rate.limit, 0)
+        tokens = float(tokens)
+        retry_after = 0 if allowed else (1 - tokens) / rate.per_second
+        return RateLimitResult(bool(allowed), rate.limit, tokens, retry_after)
+
+    def _log_error(self, error: Exception):
+        self._errors += 1
+        now = time.monotonic()
+        if self._error_logged_at is None or now - self._error_logged_at >= self.error_log_interval:
+            logger.warning("Rate limiter unavailable, allowed %d requests unchecked: %s", self._errors, error)
+            self._errors, self._error_logged_at = 0, now
+
+def make_rate_limiter(backend: str, redis_url: str = None):
+    if backend == "memory":
+        return MemoryRateLimiter()
+    if backend == "redis":
+        return RedisRateLimiter(redis_url)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
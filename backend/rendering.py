@@ -0,0 +1,70 @@
+"""Write-time rendering of post bodies.
+
+Post content is the plain text typed into the admin textarea: paragraphs
+separated by blank lines, "- " or "* " list items and ![alt](url) images.
+derive_fields() turns it into the columns stored next to it, so readers get
+HTML, an excerpt and a reading time without any per-request work. Every
+piece of content is escaped before tags are added and only http(s) image
+URLs become <img>, so the HTML is safe to insert as-is.
+"""
+import html
+import itertools
+import math
+import re
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+IMAGE = re.compile(r"!\[([^\]\n]*)\]\((https?://[^\s)]+)\)")
+LIST_ITEM = re.compile(r"^\s*[-*]\s+")
+BLANK_LINES = re.compile(r"\n\s*\n")
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    # Never longer than length, so applying it to a stored excerpt changes nothing
+    text = " ".join((text or "").split())
+    if len(text) <= length:
+        return text
+    return text[:length - 3].rsplit(" ", 1)[0] + "..."
+
+def render_inline(line: str) -> str:
+    parts, pos = [], 0
+    for match in IMAGE.finditer(line):
+        alt, src = match.groups()
+        parts.append(html.escape(line[pos:match.start()]))
+        parts.append(f'<img src="{html.escape(src)}" alt="{html.escape(alt)}" loading="lazy">')
+        pos = match.end()
+    parts.append(html.escape(line[pos:]))
+    return "".join(parts)
+
+def render_html(content: str) -> str:
+    blocks = []
+    for block in BLANK_LINES.split((content or "").replace("\r\n", "\n").strip()):
+        lines = [line.strip() for line in block.split("\n") if line.strip()]
+        # A paragraph may lead into a list ("Key trends include:" then "- ..."), so split on runs
+        for is_list, run in itertools.groupby(lines, key=lambda line: bool(LIST_ITEM.match(line))):
+            if is_list:
+                blocks.append("<ul>" + "".join(f"<li>{render_inline(LIST_ITEM.sub('', line))}</li>" for line in run) + "</ul>")
+            else:
+                blocks.append("<p>" + "<br>".join(render_inline(line) for line in run) + "</p>")
+    return "\n".join(blocks)
+
+def plain_text(content: str) -> str:
+    text = IMAGE.sub(" ", content or "")
+    return " ".join(LIST_ITEM.sub("", line) for line in text.split("\n"))
+
+def derive_fields(content: str) -> dict:
+    # Column name -> value for the Post columns derived from content
+    text = plain_text(content)
+    words = len(text.split())
+    image = IMAGE.search(content or "")
+    return {
+        "content_html": render_html(content),
+        "excerpt": make_excerpt(text),
+        "word_count": words,
+        "reading_minutes": math.ceil(words / WORDS_PER_MINUTE),
+        "first_image": image.group(2) if image else None,
+    }
+
+def derive_batch(contents: list) -> list:
+    # Process-pool entry point for the backfill
+    return [derive_fields(content) for content in contents]
@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from metrics import DB_REPLICA_LAG_SECONDS, DB_REPLICA_HEALTHY, DB_READS_TOTAL
+
+logger = logging.getLogger("foxxtalk.replicas")
+
+# 0 on a primary or a caught-up standby, otherwise seconds since the last replayed transaction
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() <= pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class Replica:
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        # Unknown until the first health check, so reads start on the primary
+        self.healthy = False
+        self.lag = None
+
+class ReplicaRouter:
+    """Routes read-only sessions to streaming replicas.
+
+    Replicas are health-checked every check_interval seconds; those that
+    are down or more than max_lag seconds behind are skipped, and reads fall
+    back to the primary when none qualify. Callers pass primary=True for a
+    client that wrote within sticky_seconds so it sees its own write; the
+    app tracks that in a signed cookie, so it holds across workers.
+    """
+
+    def __init__(self, primary_factory, engines: list, max_lag: float = 5.0, check_interval: float = 5.0,
+                 check_timeout: float = 2.0, sticky_seconds: float = 10.0):
+        self.primary_factory = primary_factory
+        self.replicas = [Replica(f"replica-{i}", engine) for i, engine in enumerate(engines)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.sticky_seconds = sticky_seconds
+        self._turn = itertools.count()
+        self._task = None
+
+    def start(self):
+        # Called from the app lifespan, and again by pick() in case the loop was never started or has died
+        if self.replicas and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def pick(self, primary: bool = False):
+        if not self.replicas or primary:
+            return None
+        self.start()
+        candidates = [r for r in self.replicas if r.healthy and r.lag <= self.max_lag]
+        if not candidates:
+            return None
+        return candidates[next(self._turn) % len(candidates)]
+
+    async def _connect(self, replica: Replica):
+        # Checks a connection out up front so a replica that went down since the last check costs a fallback, not a 500
+        db = replica.session_factory()
+        try:
+            await db.connection()
+            return db
+        except (DBAPIError, OSError) as e:
+            await db.close()
+            logger.warning("Replica %s is unreachable, reading from the primary: %s", replica.name, e)
+            self.mark_down(replica)
+            return None
+
+    @asynccontextmanager
+    async def session(self, primary: bool = False):
+        replica = self.pick(primary)
+        db = await self._connect(replica) if replica else None
+        if db is None:
+            replica, db = None, self.primary_factory()
+        DB_READS_TOTAL.labels(replica.name if replica else "primary").inc()
+        async with db:
+            try:
+                yield db
+            except DBAPIError as e:
+                # Stop routing to a replica that dropped the connection; the next check can restore it
+                if replica and e.connection_invalidated:
+                    self.mark_down(replica)
+                raise
+
+    def mark_down(self, replica: Replica):
+        replica.healthy = False
+        DB_REPLICA_HEALTHY.labels(replica.name).set(0)
+
+    async def check(self, replica: Replica):
+        try:
+            async with replica.engine.connect() as conn:
+                lag = await asyncio.wait_for(conn.scalar(LAG_QUERY), self.check_timeout)
+            replica.lag, replica.healthy = float(lag), True
+            DB_REPLICA_LAG_SECONDS.labels(replica.name).set(replica.lag)
+            DB_REPLICA_HEALTHY.labels(replica.name).set(1)
+        except Exception as e:
+            logger.warning("Replica %s failed its health check: %s", replica.name, e)
+            self.mark_down(replica)
+
+    async def _run(self):
+        while True:
+            await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+            await asyncio.sleep(self.check_interval)
+
+    async def dispose(self):
+        if self._task:
+            self._task.cancel()
+        for replica in self.replicas:
+            await replica.engine.dispose()
@@ -0,0 +1,47 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+class RequestLogger:
+    """JSON access log written by a background thread.
+
+    The request path only enqueues a record; formatting and the stdout
+    write happen on the listener thread. Successful fast requests are
+    sampled at sample_rate, errors and slow requests are always kept.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, slow_ms: float = 500, stream=None):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        self.listener = QueueListener(log_queue, handler)
+        self.logger = logging.getLogger("foxxtalk.access")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.handlers = [QueueHandler(log_queue)]
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def log(self, method: str, route: str, path: str, status: int, duration_ms: float, **fields):
+        error = status >= 500
+        if not error and duration_ms < self.slow_ms and random.random() >= self.sample_rate:
+            return
+        record = {"method": method, "route": route, "path": path, "status": status, "duration_ms": round(duration_ms, 2), **fields}
+        self.logger.log(logging.ERROR if error else logging.INFO, "request", extra={"fields": record})
@@ -0,0 +1,96 @@
+import orjson
+from fastapi import Response
+from sqlalchemy import func
+from database import Post, Page
+from rendering import EXCERPT_LENGTH, make_excerpt
+
+# Listing projection: API field name -> column
+POST_FIELDS = {
+    "id": Post.id,
+    "title": Post.title,
+    "content": Post.content,
+    "category": Post.category,
+    "tags": Post.tags,
+    "image": Post.image,
+    "author": Post.author,
+    "authorImage": Post.author_image,
+    "published": Post.published,
+    "created_at": Post.created_at,
+    "updated_at": Post.updated_at,
+    "user_id": Post.user_id,
+}
+# Computed from content at write time (rendering.derive_fields); requested by name like POST_FIELDS
+DERIVED_FIELDS = {
+    "excerpt": Post.excerpt,
+    "html": Post.content_html,
+    "wordCount": Post.word_count,
+    "readingTime": Post.reading_minutes,
+    "firstImage": Post.first_image,
+}
+SUMMARY_FIELDS = [name for name in POST_FIELDS if name != "content"] + ["excerpt", "wordCount", "readingTime", "firstImage"]
+DETAIL_FIELDS = list(POST_FIELDS) + ["html", "wordCount", "readingTime", "firstImage"]
+PAGE_FIELDS = {
+    "id": Page.id,
+    "title": Page.title,
+    "slug": Page.slug,
+    "content": Page.content,
+    "meta_description": Page.meta_description,
+    "published": Page.published,
+    "created_at": Page.created_at,
+    "updated_at": Page.updated_at,
+}
+# Landing featuredPosts.count: saves are validated against this range, reads clamp to it
+DEFAULT_FEATURED_POSTS = 3
+MAX_FEATURED_POSTS = 100
+# Stored timestamps are naive UTC; these options render them as isoformat() + "Z" would
+JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=JSON_OPTIONS)
+
+class FastJSONResponse(Response):
+    """JSON response for trusted database output.
+
+    Returning it skips FastAPI's jsonable_encoder and response_model
+    validation; datetimes are encoded by orjson directly.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def excerpt_column():
+    # Rows not yet backfilled fall back to the head of the body, which make_excerpt trims like the stored ones
+    return func.coalesce(Post.excerpt, func.substr(Post.content, 1, EXCERPT_LENGTH + 1)).label("excerpt")
+
+def post_columns(fields) -> list:
+    return [excerpt_column() if name == "excerpt" else POST_FIELDS.get(name, DERIVED_FIELDS.get(name)) for name in fields]
+
+def summary_columns():
+    return post_columns(SUMMARY_FIELDS)
+
+def serialize_rows(rows, fields) -> list:
+    # Rows selected with post_columns(fields) first; any extra trailing columns are dropped by zip
+    items = [dict(zip(fields, row)) for row in rows]
+    if "excerpt" in fields:
+        for item in items:
+            item["excerpt"] = make_excerpt(item["excerpt"])
+    return items
+
+def featured_count(landing: dict) -> int:
+    # Landing rows saved before the count was validated may hold anything
+    try:
+        count = int(landing.get("featuredPosts", {}).get("count", DEFAULT_FEATURED_POSTS))
+    except (AttributeError, TypeError, ValueError):
+        return DEFAULT_FEATURED_POSTS
+    return min(max(count, 0), MAX_FEATURED_POSTS)
+
+def serialize_post(post: Post) -> dict:
+    return {
+        "id": post.id, "title": post.title, "content": post.content, "category": post.category,
+        "tags": post.tags, "image": post.image, "author": post.author, "authorImage": post.author_image,
+        "published": post.published, "created_at": post.created_at.isoformat() + "Z",
+        "updated_at": post.updated_at.isoformat() + "Z", "user_id": post.user_id,
+        "html": post.content_html, "wordCount": post.word_count, "readingTime": post.reading_minutes,
+        "firstImage": post.first_image
+    }
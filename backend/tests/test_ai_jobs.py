@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from ai_jobs import AIJobQueue, FakeModel, JobRejected, cache_key
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_per_user_cap():
+    async def scenario():
+        queue = AIJobQueue(FakeModel(latency=0.05), per_user=2)
+        first = queue.submit("alice", "text", "generate_title", {"title": "a"}, "")
+        queue.submit("alice", "text", "generate_title", {"title": "b"}, "")
+        with pytest.raises(JobRejected):
+            queue.submit("alice", "text", "generate_title", {"title": "c"}, "")
+        # Other users are not affected
+        queue.submit("bob", "text", "generate_title", {"title": "c"}, "")
+        assert await first.wait(1)
+        # A finished job frees its slot
+        queue.submit("alice", "text", "generate_title", {"title": "c"}, "")
+    run(scenario())
+
+def test_timeout_fails_the_job():
+    async def scenario():
+        queue = AIJobQueue(FakeModel(latency=1), timeout=0.05)
+        job = queue.submit("alice", "text", "generate_title", {}, "")
+        assert await job.wait(1)
+        assert job.status == "failed"
+        assert job.error == "Timed out after 0.05s"
+        assert not queue.cache
+        assert not queue._active
+    run(scenario())
+
+def test_results_are_cached_by_prompt_and_data():
+    async def scenario():
+        queue = AIJobQueue(FakeModel())
+        job = queue.submit("alice", "text", "generate_category", {"title": "x", "tags": "a"}, "")
+        assert await job.wait(1)
+        assert not job.cached
+        # Key order in currentData does not matter; any other value does
+        hit = queue.submit("bob", "text", "generate_category", {"tags": "a", "title": "x"}, "")
+        assert hit.cached and hit.status == "done" and hit.result == job.result
+        assert not queue.submit("alice", "text", "generate_category", {"title": "y", "tags": "a"}, "").cached
+        assert not queue.submit("alice", "image", "generate_category", {"title": "x", "tags": "a"}, "").cached
+        assert cache_key("text", "p", {"a": 1, "b": 2}) == cache_key("text", "p", {"b": 2, "a": 1})
+    run(scenario())
+
+def test_cache_is_bounded():
+    async def scenario():
+        queue = AIJobQueue(FakeModel(), cache_size=2)
+        for title in "abc":
+            assert await queue.submit("alice", "text", "generate_title", {"title": title}, "").wait(1)
+        assert len(queue.cache) == 2
+        assert cache_key("text", "generate_title", {"title": "a"}) not in queue.cache
+    run(scenario())
+
+def test_identical_in_flight_jobs_are_shared():
+    async def scenario():
+        model = FakeModel(latency=0.05)
+        calls = []
+        generate = model.generate
+        async def counting_generate(*args):
+            calls.append(args)
+            return await generate(*args)
+        model.generate = counting_generate
+
+        queue = AIJobQueue(model)
+        first = queue.submit("alice", "text", "generate_tags", {"title": "x"}, "")
+        again = queue.submit("alice", "text", "generate_tags", {"title": "x"}, "")
+        assert again is first
+        # Jobs are per user, so another user's identical request gets its own job
+        other = queue.submit("bob", "text", "generate_tags", {"title": "x"}, "")
+        assert other is not first
+        assert queue.submit("bob", "text", "generate_tags", {"title": "x"}, "") is other
+        assert await first.wait(1) and await other.wait(1)
+        assert first.result == other.result
+        assert len(calls) == 2
+        assert not queue._in_flight
+    run(scenario())
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+import analytics
+from analytics import ViewRecorder
+from metrics import ANALYTICS_VIEWS_DROPPED
+
+class DownEngine:
+    def connect(self):
+        return self
+
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        raise ConnectionRefusedError("database is down")
+
+    async def __aexit__(self, *exc):
+        pass
+
+def dropped():
+    return ANALYTICS_VIEWS_DROPPED._value.get()
+
+def test_failed_flush_keeps_the_batch(monkeypatch):
+    monkeypatch.setattr(analytics, "async_engine", DownEngine())
+    recorder = ViewRecorder(max_buffer=5)
+    recorder.buffer = [(1, None), (2, None), (3, None)]
+    with pytest.raises(ConnectionRefusedError):
+        asyncio.run(recorder.flush())
+    assert [post_id for post_id, _ in recorder.buffer] == [1, 2, 3]
+
+def test_requeued_views_are_capped(monkeypatch):
+    monkeypatch.setattr(analytics, "async_engine", DownEngine())
+    recorder = ViewRecorder(max_buffer=4)
+
+    async def flush_while_recording():
+        recorder.buffer = [(1, None), (2, None), (3, None)]
+        flushing = asyncio.create_task(recorder.flush())
+        await asyncio.sleep(0)
+        # Views recorded while the COPY runs land in the new buffer
+        assert recorder.buffer == []
+        recorder.buffer.extend([(4, None), (5, None)])
+        with pytest.raises(ConnectionRefusedError):
+            await flushing
+
+    before = dropped()
+    asyncio.run(flush_while_recording())
+    assert [post_id for post_id, _ in recorder.buffer] == [1, 2, 3, 4]
+    assert dropped() - before == 1
+
+def test_close_logs_instead_of_raising(monkeypatch, caplog):
+    monkeypatch.setattr(analytics, "async_engine", DownEngine())
+    recorder = ViewRecorder()
+
+    async def record_and_close():
+        recorder.record(1)
+        await recorder.close()
+        await asyncio.sleep(0)
+        return recorder._task.cancelled()
+
+    assert asyncio.run(record_and_close())
+    assert "Final view analytics flush failed; 1 views lost" in caplog.text
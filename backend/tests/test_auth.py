@@ -0,0 +1,70 @@
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from auth import PLACEHOLDER_SECRET_KEY, InvalidToken, _b64decode, _b64encode, check_secret_key, decode_token, issue_token, sign_value, unsign_value
+
+KEY = "test-secret-key"
+
+def test_round_trip():
+    payload = decode_token(KEY, issue_token(KEY, "admin-001", "admin@example.com", 60))
+    assert payload["sub"] == "admin-001"
+    assert payload["email"] == "admin@example.com"
+    assert payload["exp"] > time.time()
+    assert payload["jti"]
+
+def test_tokens_have_unique_ids():
+    first, second = (decode_token(KEY, issue_token(KEY, "admin-001", "a@example.com", 60)) for _ in range(2))
+    assert first["jti"] != second["jti"]
+
+def test_wrong_key_rejected():
+    with pytest.raises(InvalidToken, match="Bad signature"):
+        decode_token("other-key", issue_token(KEY, "admin-001", "a@example.com", 60))
+
+def test_tampered_payload_rejected():
+    body, signature = issue_token(KEY, "user-1", "a@example.com", 60).split(".")
+    payload = json.loads(_b64decode(body))
+    payload["sub"] = "admin-001"
+    forged = _b64encode(json.dumps(payload).encode())
+    with pytest.raises(InvalidToken, match="Bad signature"):
+        decode_token(KEY, f"{forged}.{signature}")
+
+def test_expired_token_rejected():
+    with pytest.raises(InvalidToken, match="expired"):
+        decode_token(KEY, issue_token(KEY, "admin-001", "a@example.com", -1))
+
+@pytest.mark.parametrize("token", ["", "garbage", "a.b.c", "not base64!.sig", f"{_b64encode(b'not json')}."])
+def test_malformed_token_rejected(token):
+    with pytest.raises(InvalidToken):
+        decode_token(KEY, token)
+
+def test_signed_non_json_body_rejected():
+    body = _b64encode(b"not json")
+    signature = _b64encode(hmac.new(KEY.encode(), body.encode(), hashlib.sha256).digest())
+    with pytest.raises(InvalidToken, match="Malformed"):
+        decode_token(KEY, f"{body}.{signature}")
+
+def test_signed_values():
+    signed = sign_value(KEY, "read-primary:1700000000")
+    assert unsign_value(KEY, signed) == "read-primary:1700000000"
+    assert unsign_value("other-key", signed) is None
+    assert unsign_value(KEY, signed.replace("1700000000", "1900000000")) is None
+    for garbage in ["", "no-signature", "value.!!!", None]:
+        assert unsign_value(KEY, garbage) is None
+
+@pytest.mark.parametrize("secret_key", ["", None, PLACEHOLDER_SECRET_KEY])
+def test_unsafe_secret_key_refused(secret_key):
+    with pytest.raises(RuntimeError):
+        check_secret_key(secret_key)
+
+def test_secret_key_accepted():
+    check_secret_key("a-private-random-value")
+
+def test_app_refuses_to_start_with_placeholder_key(monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+    monkeypatch.setattr(main, "SECRET_KEY", PLACEHOLDER_SECRET_KEY)
+    with pytest.raises(RuntimeError, match="SECRET_KEY"):
+        with TestClient(main.app):
+            pass
@@ -0,0 +1,40 @@
+import asyncio
+import json
+import uuid
+import pytest
+from sqlalchemy import select, delete, func
+from bulk import export_posts, import_posts, iter_records
+from database import AsyncSessionLocal, dispose_engines, Post
+
+async def chunks(text: str):
+    yield text.encode()
+
+async def export_import_round_trip(title: str):
+    from main import PostImport
+    async with AsyncSessionLocal() as db:
+        # Created like create_post does, without an external id
+        posts = [Post(title=title, content=f"Body {i}", author="Test", published=True) for i in range(2)]
+        db.add_all(posts)
+        await db.commit()
+        ids = {post.id for post in posts}
+    try:
+        exported = "".join([chunk async for chunk in export_posts("ndjson")])
+        lines = "".join(line + "\n" for line in exported.splitlines() if json.loads(line)["id"] in ids)
+        report = await import_posts(iter_records(chunks(lines), "ndjson"), PostImport)
+        async with AsyncSessionLocal() as db:
+            count = await db.scalar(select(func.count()).select_from(Post).where(Post.title == title))
+        return report, ids, count
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Post).where(Post.title == title))
+            await db.commit()
+        await dispose_engines()
+
+def test_export_reimports_onto_the_same_posts():
+    try:
+        report, ids, count = asyncio.run(export_import_round_trip(f"bulk-test-{uuid.uuid4()}"))
+    except OSError as e:
+        pytest.skip(f"database not available: {e}")
+    assert (report["inserted"], report["updated"], report["failed"]) == (0, 2, 0)
+    assert set(report["ids"]) == ids
+    assert count == 2
@@ -0,0 +1,50 @@
+import asyncio
+from collections import namedtuple
+from changes import load_changes
+
+PostRow = namedtuple("PostRow", ["id", "title", "change_seq"])
+Tombstone = namedtuple("Tombstone", ["post_id", "change_seq"])
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+class FakeSession:
+    """Returns the post rows for the first query and the tombstones for the second."""
+
+    def __init__(self, posts, tombstones):
+        self.results = [posts, tombstones]
+
+    async def execute(self, statement):
+        return FakeResult(self.results.pop(0))
+
+def load(posts, tombstones, since=0, limit=10):
+    return asyncio.run(load_changes(FakeSession(posts, tombstones), since, ["id", "title"], limit))
+
+POSTS = [PostRow(1, "one", 11), PostRow(3, "three", 13), PostRow(5, "five", 15)]
+TOMBSTONES = [Tombstone(2, 12), Tombstone(4, 14)]
+
+def test_upserts_and_deletes_merge_in_sequence_order():
+    page = load(POSTS, TOMBSTONES, since=10)
+    assert [(change["seq"], change["op"]) for change in page["changes"]] == [
+        (11, "upsert"), (12, "delete"), (13, "upsert"), (14, "delete"), (15, "upsert")
+    ]
+    assert page["changes"][0]["post"] == {"id": 1, "title": "one"}
+    assert page["changes"][1] == {"seq": 12, "op": "delete", "id": 2}
+    assert (page["cursor"], page["hasMore"]) == (15, False)
+
+def test_page_is_cut_after_the_merge():
+    page = load(POSTS, TOMBSTONES, since=10, limit=3)
+    assert [change["seq"] for change in page["changes"]] == [11, 12, 13]
+    assert (page["cursor"], page["hasMore"]) == (13, True)
+
+def test_deletes_only():
+    page = load([], TOMBSTONES, since=11, limit=2)
+    assert [change["op"] for change in page["changes"]] == ["delete", "delete"]
+    assert (page["cursor"], page["hasMore"]) == (14, False)
+
+def test_empty_page_keeps_the_cursor():
+    assert load([], [], since=42) == {"changes": [], "cursor": 42, "hasMore": False}
@@ -0,0 +1,71 @@
+import gzip
+import pytest
+from fastapi import Response
+import compression
+from compression import CompressedCache, negotiate_encoding
+
+@pytest.fixture
+def both_encodings(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("br", "gzip"))
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("BR;q=1.0, gzip;q=0.8", "br"),
+    ("br;q=0, gzip;q=0", None),
+    ("br;q=oops, gzip;q=0.1", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate_encoding(both_encodings, accept, expected):
+    assert negotiate_encoding(accept) == expected
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    assert negotiate_encoding("br, gzip;q=0.1") == "gzip"
+    assert negotiate_encoding("br") is None
+
+def body(n: int) -> bytes:
+    # Incompressible enough that each entry has a predictable size
+    return bytes(range(256)) * n
+
+def test_put_compresses_and_get_replays():
+    cache = CompressedCache(minimum_size=10)
+    response = cache.put('"a"', "gzip", Response(content=body(8), media_type="application/json"))
+    assert gzip.decompress(response.body) == body(8)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    hit = cache.get('"a"', "gzip")
+    assert hit.body == response.body
+    assert hit.headers["content-length"] == str(len(response.body))
+    assert cache.get('"a"', "br") is None
+    assert cache.get('"a"', None) is None
+
+def test_small_bodies_are_left_alone():
+    cache = CompressedCache(minimum_size=1000)
+    response = cache.put('"a"', "gzip", Response(content=b"{}"))
+    assert response.body == b"{}" and "content-encoding" not in response.headers
+    assert cache.get('"a"', "gzip") is None
+
+def test_lru_eviction_by_bytes():
+    cache = CompressedCache(minimum_size=0)
+    sizes = {}
+    for tag in "abc":
+        sizes[tag] = len(cache.put(f'"{tag}"', "gzip", Response(content=body(4) + tag.encode())).body)
+    # Room for three entries (they differ by a few bytes at most), not four
+    cache.max_bytes = sizes["a"] + sizes["b"] + sizes["c"] + 8
+    # Touch "a" so "b" is the least recently used
+    assert cache.get('"a"', "gzip")
+    cache.put('"d"', "gzip", Response(content=body(4) + b"d"))
+    assert cache.get('"b"', "gzip") is None
+    assert all(cache.get(f'"{tag}"', "gzip") for tag in "acd")
+    assert cache.size == sum(len(entry[0]) for entry in cache._entries.values()) <= cache.max_bytes
+
+def test_replacing_an_entry_keeps_the_size_accurate():
+    cache = CompressedCache(minimum_size=0)
+    cache.put('"a"', "gzip", Response(content=body(4)))
+    cache.put('"a"', "gzip", Response(content=body(8)))
+    assert len(cache._entries) == 1
+    assert cache.size == len(cache._entries[('"a"', "gzip")][0])
@@ -0,0 +1,31 @@
+import base64
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from main import decode_cursor, encode_cursor
+
+def test_round_trip():
+    created_at = datetime(2026, 10, 18, 9, 5, 3, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+    assert decode_cursor(encode_cursor(datetime(2026, 1, 1), 7)) == (datetime(2026, 1, 1), 7)
+
+def b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    "é",
+    encode_cursor(datetime(2026, 10, 18), 42)[:-3],
+    b64("2026-10-18T00:00:00"),
+    b64("2026-10-18T00:00:00|42|1"),
+    b64("2026-13-40T00:00:00|42"),
+    b64("2026-10-18T00:00:00|forty-two"),
+    base64.urlsafe_b64encode(b"\xff\xfe|1").decode(),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
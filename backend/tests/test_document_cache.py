@@ -0,0 +1,73 @@
+import asyncio
+from cache import DocumentCache
+
+class FakeSession:
+    """Answers the resource_versions lookup with a fixed version."""
+
+    def __init__(self, version: int, read_your_writes: bool = False):
+        self.version = version
+        self.info = {"read_your_writes": read_your_writes}
+        self.version_reads = 0
+
+    async def scalar(self, statement):
+        self.version_reads += 1
+        return self.version
+
+def loader(body: bytes):
+    calls = []
+    async def load(db):
+        calls.append(db)
+        return body, None
+    return load, calls
+
+def get(cache, db, load):
+    return asyncio.run(cache.get(db, "landing", load))
+
+def test_entry_is_reused_until_the_version_moves():
+    cache = DocumentCache(check_interval=0)
+    load, calls = loader(b'{"v": 1}')
+    assert get(cache, FakeSession(1), load).body == b'{"v": 1}'
+    assert get(cache, FakeSession(1), load).version == 1
+    assert len(calls) == 1
+
+    load, calls = loader(b'{"v": 2}')
+    entry = get(cache, FakeSession(2), load)
+    assert (entry.version, entry.body, len(calls)) == (2, b'{"v": 2}', 1)
+
+def test_missing_version_row_counts_as_zero():
+    cache = DocumentCache(check_interval=0)
+    load, calls = loader(b"{}")
+    get(cache, FakeSession(None), load)
+    get(cache, FakeSession(None), load)
+    assert len(calls) == 1
+
+def test_lagging_replica_never_downgrades_an_entry():
+    cache = DocumentCache(check_interval=0)
+    load, _ = loader(b'{"v": 3}')
+    get(cache, FakeSession(3), load)
+    stale, calls = loader(b'{"v": 2}')
+    entry = get(cache, FakeSession(2), stale)
+    assert (entry.version, entry.body, calls) == (3, b'{"v": 3}', [])
+
+def test_check_interval_skips_the_version_read_except_for_read_your_writes():
+    cache = DocumentCache(check_interval=60)
+    load, _ = loader(b'{"v": 1}')
+    get(cache, FakeSession(1), load)
+
+    db = FakeSession(2)
+    assert get(cache, db, load).version == 1
+    assert db.version_reads == 0
+
+    # A client that just wrote always compares versions
+    db = FakeSession(2, read_your_writes=True)
+    fresh, _ = loader(b'{"v": 2}')
+    assert get(cache, db, fresh).body == b'{"v": 2}'
+    assert db.version_reads == 1
+
+def test_invalidate_forces_a_reload():
+    cache = DocumentCache(check_interval=60)
+    load, calls = loader(b"{}")
+    get(cache, FakeSession(1), load)
+    cache.invalidate("landing")
+    get(cache, FakeSession(1), load)
+    assert len(calls) == 2
@@ -0,0 +1,40 @@
+from datetime import datetime
+from starlette.requests import Request
+from http_cache import http_date, is_not_modified, make_etag, not_modified
+
+ETAG = make_etag("post", 1, 42)
+MODIFIED = datetime(2026, 10, 18, 12, 30, 15, 500000)
+
+def request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+def test_if_none_match():
+    assert is_not_modified(request(if_none_match=ETAG), ETAG, MODIFIED)
+    assert is_not_modified(request(if_none_match=f'"other", {ETAG}'), ETAG, MODIFIED)
+    # Weak comparison: a W/ prefix from a proxy still matches
+    assert is_not_modified(request(if_none_match=f"W/{ETAG}"), ETAG, MODIFIED)
+    assert is_not_modified(request(if_none_match="*"), ETAG, MODIFIED)
+    assert not is_not_modified(request(if_none_match='"other"'), ETAG, MODIFIED)
+    assert not is_not_modified(request(if_none_match=ETAG.strip('"')), ETAG, MODIFIED)
+
+def test_if_modified_since():
+    assert is_not_modified(request(if_modified_since=http_date(MODIFIED)), ETAG, MODIFIED)
+    assert is_not_modified(request(if_modified_since="Sun, 18 Oct 2026 13:00:00 GMT"), ETAG, MODIFIED)
+    assert not is_not_modified(request(if_modified_since="Sun, 18 Oct 2026 12:30:14 GMT"), ETAG, MODIFIED)
+    assert not is_not_modified(request(if_modified_since="yesterday"), ETAG, MODIFIED)
+    assert not is_not_modified(request(if_modified_since=http_date(MODIFIED)), ETAG, None)
+    assert not is_not_modified(request(), ETAG, MODIFIED)
+
+def test_if_none_match_wins_over_if_modified_since():
+    later = "Mon, 19 Oct 2026 00:00:00 GMT"
+    assert not is_not_modified(request(if_none_match='"other"', if_modified_since=later), ETAG, MODIFIED)
+    assert is_not_modified(request(if_none_match=ETAG, if_modified_since="Thu, 01 Jan 1970 00:00:00 GMT"), ETAG, MODIFIED)
+
+def test_not_modified_response():
+    response = not_modified(ETAG, MODIFIED, "public, max-age=0")
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == ETAG
+    assert response.headers["last-modified"] == "Sun, 18 Oct 2026 12:30:15 GMT"
+    assert response.headers["cache-control"] == "public, max-age=0"
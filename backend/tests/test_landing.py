@@ -0,0 +1,24 @@
+import pytest
+from pydantic import ValidationError
+from serializers import DEFAULT_FEATURED_POSTS, MAX_FEATURED_POSTS, featured_count
+
+@pytest.mark.parametrize("landing, expected", [
+    ({}, DEFAULT_FEATURED_POSTS),
+    ({"featuredPosts": {"count": 5}}, 5),
+    ({"featuredPosts": {"count": "7"}}, 7),
+    ({"featuredPosts": {"count": -4}}, 0),
+    ({"featuredPosts": {"count": 10_000}}, MAX_FEATURED_POSTS),
+    ({"featuredPosts": {"count": None}}, DEFAULT_FEATURED_POSTS),
+    ({"featuredPosts": {"count": "abc"}}, DEFAULT_FEATURED_POSTS),
+    ({"featuredPosts": "oops"}, DEFAULT_FEATURED_POSTS),
+])
+def test_featured_count_clamps_stored_data(landing, expected):
+    assert featured_count(landing) == expected
+
+def test_landing_save_validates_count():
+    from main import LandingPageData
+    assert LandingPageData(hero={}, featuredPosts={"count": "4"}).featuredPosts["count"] == 4
+    assert LandingPageData(hero={}, featuredPosts={}).featuredPosts["count"] == DEFAULT_FEATURED_POSTS
+    for count in [None, "abc", 2.5, True, -1, MAX_FEATURED_POSTS + 1]:
+        with pytest.raises(ValidationError):
+            LandingPageData(hero={}, featuredPosts={"count": count})
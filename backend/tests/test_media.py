@@ -0,0 +1,62 @@
+import asyncio
+import io
+import json
+import pytest
+from PIL import Image
+from starlette.datastructures import UploadFile
+import media
+from media import InvalidImage, LocalStorage, MediaPipeline, UploadTooLarge
+
+def png(width: int, height: int, color="orange") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def upload(data: bytes, filename: str = "photo.PNG", size: int = None) -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=len(data) if size is None else size, filename=filename)
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return MediaPipeline(LocalStorage(str(tmp_path), "http://cdn.test/media/"), workers=1, max_bytes=1024 * 1024)
+
+def test_variants_and_srcset(pipeline, tmp_path):
+    manifest = asyncio.run(pipeline.process(upload(png(1000, 500))))
+    prefix = f"http://cdn.test/media/blog-images/{manifest['hash'][:32]}"
+    assert manifest["url"] == f"{prefix}/original.png"
+    assert (manifest["width"], manifest["height"]) == (1000, 500)
+    # Never upscaled: the hero variant keeps the original width
+    assert {name: (v["width"], v["height"]) for name, v in manifest["variants"].items()} == {
+        "thumbnail": (320, 160), "card": (800, 400), "hero": (1000, 500)
+    }
+    assert manifest["variants"]["card"]["webp"] == f"{prefix}/card.webp"
+    assert manifest["srcset"]["webp"] == f"{prefix}/thumbnail.webp 320w, {prefix}/card.webp 800w, {prefix}/hero.webp 1000w"
+    assert set(manifest["srcset"]) == set(media.variant_formats())
+
+    stored = tmp_path / "blog-images" / manifest["hash"][:32]
+    assert json.loads((stored / "manifest.json").read_text()) == manifest
+    assert (stored / "original.png").read_bytes() == png(1000, 500)
+    with Image.open(stored / "thumbnail.webp") as thumbnail:
+        assert thumbnail.size == (320, 160)
+
+def test_reupload_reuses_the_manifest(pipeline, monkeypatch):
+    first = asyncio.run(pipeline.process(upload(png(400, 300), "a.png")))
+
+    def fail(*args):
+        raise AssertionError("variants rebuilt for identical bytes")
+    monkeypatch.setattr(media, "build_variants", fail)
+    assert asyncio.run(pipeline.process(upload(png(400, 300), "b.png"))) == first
+
+def test_non_images_are_rejected(pipeline, tmp_path):
+    for data in [b"<html>not an image</html>", png(10, 10)[:40]]:
+        with pytest.raises(InvalidImage):
+            asyncio.run(pipeline.process(upload(data, "x.png")))
+    assert not (tmp_path / "blog-images").exists()
+
+def test_size_cap(tmp_path):
+    pipeline = MediaPipeline(LocalStorage(str(tmp_path), "http://cdn.test"), workers=1, max_bytes=100)
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(pipeline.process(upload(png(50, 50))))
+    # The streamed size is checked too when the declared size is missing or wrong
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(pipeline.process(upload(b"x" * 101, size=0)))
+    assert not (tmp_path / "blog-images").exists()
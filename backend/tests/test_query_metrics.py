@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from database import instrument_queries
+from metrics import DB_QUERY_SECONDS
+
+def observed(statement: str) -> float:
+    for metric in DB_QUERY_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels["statement"] == statement:
+                return sample.value
+    return 0
+
+def test_failed_statements_leave_nothing_on_the_connection():
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    before = observed("SELECT")
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert not conn.info
+    assert observed("SELECT") - before == 1
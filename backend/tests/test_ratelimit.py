@@ -0,0 +1,25 @@
+import asyncio
+from ratelimit import MemoryRateLimiter, parse_rate
+
+def hit(limiter, key, rate):
+    return asyncio.run(limiter.hit(key, rate))
+
+def test_bucket_limits_and_retry_after():
+    limiter, rate = MemoryRateLimiter(), parse_rate("2/minute")
+    assert [hit(limiter, "a", rate).allowed for _ in range(3)] == [True, True, False]
+    assert hit(limiter, "a", rate).retry_after == 30
+    assert hit(limiter, "b", rate).allowed
+
+def test_active_keys_are_bounded():
+    limiter, rate = MemoryRateLimiter(max_keys=100), parse_rate("5/minute")
+    for i in range(1000):
+        hit(limiter, f"client-{i}", rate)
+    assert len(limiter._buckets) == 100
+    # The most recent clients keep their buckets
+    assert limiter._buckets["client-999"][0] == 4
+
+def test_refilled_buckets_are_dropped():
+    limiter = MemoryRateLimiter()
+    hit(limiter, "a", parse_rate("1000000/second"))
+    hit(limiter, "b", parse_rate("1/day"))
+    assert list(limiter._buckets) == ["b"]
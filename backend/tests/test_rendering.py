@@ -0,0 +1,50 @@
+from rendering import EXCERPT_LENGTH, derive_fields, make_excerpt, render_html
+
+def test_text_is_escaped():
+    assert render_html("<script>alert(1)</script> & more") == "<p>&lt;script&gt;alert(1)&lt;/script&gt; &amp; more</p>"
+
+def test_only_http_images_become_tags():
+    for src in ["javascript:alert(1)", "data:image/png;base64,AAAA", "//evil.example/x.png"]:
+        html = render_html(f"![x]({src})")
+        assert "<img" not in html
+        assert html == f"<p>![x]({src})</p>"
+    assert render_html("![a cat](https://example.com/cat.png)") == (
+        '<p><img src="https://example.com/cat.png" alt="a cat" loading="lazy"></p>'
+    )
+
+def test_image_attributes_are_escaped():
+    html = render_html('![say "hi" <b>](https://example.com/a.png?x="1"&y=2)')
+    assert '<img src="https://example.com/a.png?x=&quot;1&quot;&amp;y=2"' in html
+    assert 'alt="say &quot;hi&quot; &lt;b&gt;"' in html
+
+def test_paragraphs_and_lists():
+    content = "First line\r\nsecond line\n\n\nKey trends include:\n- one\n* <two>\n\nLast"
+    assert render_html(content) == "\n".join([
+        "<p>First line<br>second line</p>",
+        "<p>Key trends include:</p>",
+        "<ul><li>one</li><li>&lt;two&gt;</li></ul>",
+        "<p>Last</p>",
+    ])
+    assert render_html("") == ""
+    assert render_html(None) == ""
+
+def test_derived_fields():
+    content = "Intro with an image ![alt](http://example.com/1.png) here\n\n- item one\n- item two ![b](https://example.com/2.png)"
+    fields = derive_fields(content)
+    assert fields["excerpt"] == "Intro with an image here item one item two"
+    assert fields["word_count"] == 9
+    assert fields["reading_minutes"] == 1
+    assert fields["first_image"] == "http://example.com/1.png"
+    assert fields["content_html"] == render_html(content)
+
+    fields = derive_fields(" ".join(["word"] * 401))
+    assert fields["word_count"] == 401
+    assert fields["reading_minutes"] == 3
+    assert len(fields["excerpt"]) <= EXCERPT_LENGTH
+    assert fields["excerpt"].endswith("word...")
+    assert derive_fields("") == {"content_html": "", "excerpt": "", "word_count": 0, "reading_minutes": 0, "first_image": None}
+
+def test_excerpt_is_idempotent():
+    excerpt = make_excerpt("x" * 50 + " " + "y" * 300)
+    assert excerpt == "x" * 50 + "..."
+    assert make_excerpt(excerpt) == excerpt
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 
 function Admin() {
   const [activeTab, setActiveTab] = useState('create')
@@ -66,6 +66,9 @@ function Admin() {
     customJS: ''
   })
   const [posts, setPosts] = useState([])
+  // Posts by id plus the last change seen, so the list is kept current from deltas
+  const postsById = useRef(new Map())
+  const postsCursor = useRef(0)
   const [analytics, setAnalytics] = useState({ totalPosts: 0, totalViews: 0, monthlyViews: 0 })
 
   const handleLandingSubmit = async (e) => {
@@ -87,7 +90,9 @@ function Admin() {
 
   const loadLandingData = async () => {
     try {
-      const response = await fetch('/api/landing')
+      const response = await fetch('/api/landing', {
+        headers: { 'Authorization': `Bearer ${localStorage.getItem('authToken')}` }
+      })
       if (response.ok) {
         const data = await response.json()
         setLandingData(data)
@@ -116,7 +121,9 @@ function Admin() {
 
   const loadBlogSettings = async () => {
     try {
-      const response = await fetch('/api/blog-settings')
+      const response = await fetch('/api/blog-settings', {
+        headers: { 'Authorization': `Bearer ${localStorage.getItem('authToken')}` }
+      })
       if (response.ok) {
         const data = await response.json()
         setBlogSettings(data)
@@ -149,29 +156,81 @@ function Admin() {
       loadBlogSettings().catch(console.error)
     }
     // Temporarily disabled
-    // if (activeTab === 'manage') {
-    //   loadPosts()
-    // }
     // if (activeTab === 'analytics') {
     //   loadAnalytics()
     // }
   }, [activeTab])
 
-  const loadPosts = async () => {
+  useEffect(() => {
+    if (activeTab !== 'manage') return
+    // Catch up, then stay current from the change stream until the tab changes
+    const controller = new AbortController()
+    syncPosts()
+      .then(() => streamPosts(controller.signal))
+      .catch(err => {
+        if (err.name !== 'AbortError') console.error('Post change stream failed:', err)
+      })
+    return () => controller.abort()
+  }, [activeTab])
+
+  const applyPostChanges = (changes) => {
+    if (changes.length === 0) return
+    for (const change of changes) {
+      if (change.op === 'delete') {
+        postsById.current.delete(change.id)
+      } else {
+        postsById.current.set(change.post.id, change.post)
+      }
+      postsCursor.current = Math.max(postsCursor.current, change.seq)
+    }
+    setPosts([...postsById.current.values()].sort((a, b) => b.created_at.localeCompare(a.created_at) || b.id - a.id))
+  }
+
+  const syncPosts = async () => {
     try {
-      const response = await fetch('/api/posts')
-      if (response.ok) {
+      let hasMore = true
+      while (hasMore) {
+        const response = await fetch(`/api/posts/changes?since=${postsCursor.current}`, {
+          headers: { 'Authorization': `Bearer ${localStorage.getItem('authToken')}` }
+        })
+        if (!response.ok) return
         const data = await response.json()
-        setPosts(data)
+        applyPostChanges(data.changes)
+        hasMore = data.hasMore
       }
     } catch (err) {
       console.error('Failed to load posts:', err)
     }
   }
 
+  // EventSource cannot send the Authorization header, so the stream is read with fetch
+  const streamPosts = async (signal) => {
+    const response = await fetch(`/api/posts/changes/stream?since=${postsCursor.current}`, {
+      headers: { 'Authorization': `Bearer ${localStorage.getItem('authToken')}` },
+      signal
+    })
+    if (!response.ok) return
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) return
+      buffer += value
+      const events = buffer.split('\n\n')
+      buffer = events.pop()
+      applyPostChanges(events.flatMap(event => event.split('\n')
+        .filter(line => line.startsWith('data: '))
+        .map(line => JSON.parse(line.slice(6)))))
+    }
+  }
+
   const loadAnalytics = async () => {
     try {
-      const response = await fetch('/api/analytics')
+      const response = await fetch('/api/analytics', {
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('authToken')}`
+        }
+      })
       if (response.ok) {
         const data = await response.json()
         setAnalytics(data)
@@ -190,7 +249,7 @@ function Admin() {
             'Authorization': `Bearer ${localStorage.getItem('authToken')}`
           }
         })
-        loadPosts()
+        syncPosts()
         alert('Post deleted successfully')
       } catch (err) {
         console.error('Failed to delete post:', err)
@@ -206,6 +265,7 @@ function Admin() {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ title, content, category, tags, image, author, authorImage, published: true })
       })
+      syncPosts()
       setTitle('')
       setContent('')
       setImage('')
@@ -11,35 +11,55 @@ function Blog() {
     {id: 6, title: "Video Production Tips", content: "Professional video production techniques for content creators on any budget.", image: "https://picsum.photos/400/200?random=6", category: "creative", author: "SlyyFoxx", authorImage: "https://picsum.photos/40/40?random=101"}
   ])
   const [currentPage, setCurrentPage] = useState(1)
+  const [cursors, setCursors] = useState([null])
+  const [totalPosts, setTotalPosts] = useState(0)
   const [searchTerm, setSearchTerm] = useState('')
   const [selectedCategory, setSelectedCategory] = useState('all')
   const postsPerPage = 12
   
-  // Filter posts based on search and category
-  const filteredPosts = posts.filter(post => {
-    const matchesSearch = post.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         post.content.toLowerCase().includes(searchTerm.toLowerCase())
-    const matchesCategory = selectedCategory === 'all' || post.category === selectedCategory
-    return matchesSearch && matchesCategory
-  })
-  
-  // Calculate pagination
-  const indexOfLastPost = currentPage * postsPerPage
-  const indexOfFirstPost = indexOfLastPost - postsPerPage
-  const currentPosts = filteredPosts.slice(indexOfFirstPost, indexOfLastPost)
-  const totalPages = Math.ceil(filteredPosts.length / postsPerPage)
+  const isFiltering = searchTerm.trim() !== '' || selectedCategory !== 'all'
+  const totalPages = Math.ceil(totalPosts / postsPerPage)
+  const pageCount = isFiltering ? totalPages : cursors.length
 
   useEffect(() => {
-    fetch('/api/posts')
-      .then(res => res.json())
-      .then(data => {
-        setPosts(data)
-        // Update featured posts on landing page with latest 3 posts
-        const featured = data.slice(-3).reverse() // Get 3 newest posts
-        // This would update a global state or context in a real app
-      })
-      .catch(err => console.log('Using mock data'))
-  }, [])
+    let url
+    if (isFiltering) {
+      // Search and category filtering run server-side, ranked by relevance
+      const params = new URLSearchParams({ q: searchTerm, limit: postsPerPage, offset: (currentPage - 1) * postsPerPage })
+      if (selectedCategory !== 'all') params.set('category', selectedCategory)
+      url = `/api/posts/search?${params}`
+    } else {
+      const cursor = cursors[currentPage - 1]
+      const params = new URLSearchParams({ view: 'summary', limit: postsPerPage })
+      if (cursor) params.set('cursor', cursor)
+      url = `/api/posts?${params}`
+    }
+
+    const timer = setTimeout(() => {
+      fetch(url)
+        .then(res => {
+          setTotalPosts(Number(res.headers.get('X-Total-Count')) || 0)
+          const nextCursor = res.headers.get('X-Next-Cursor')
+          if (!isFiltering && nextCursor) {
+            setCursors(prev => {
+              const updated = prev.slice(0, currentPage)
+              updated[currentPage] = nextCursor
+              return updated
+            })
+          }
+          return res.json()
+        })
+        .then(data => setPosts(data))
+        .catch(err => console.log('Using mock data'))
+    }, isFiltering ? 250 : 0)
+    return () => clearTimeout(timer)
+  }, [currentPage, searchTerm, selectedCategory])
+
+  // Render <mark> highlights from search snippets without injecting HTML
+  const renderSnippet = (snippet) =>
+    snippet.split(/(<mark>.*?<\/mark>)/).map((part, index) =>
+      part.startsWith('<mark>') ? <mark key={index}>{part.slice(6, -7)}</mark> : part
+    )
 
   return (
     <div className="container">
@@ -81,14 +101,15 @@ function Blog() {
         </div>
       </div>
       <div className="featured-grid">
-        {currentPosts.map(post => (
+        {posts.map(post => (
           <div key={post.id} className="featured-post">
-            <img src={post.image} alt={post.title} className="featured-image" />
+            <img src={post.image || post.firstImage} alt={post.title} className="featured-image" />
             <h3>{post.title}</h3>
-            <p>{post.content.substring(0, 120)}...</p>
+            <p>{post.snippet ? renderSnippet(post.snippet) : (post.excerpt ?? `${post.content.substring(0, 120)}...`)}</p>
             <div className="featured-author">
               <img src={post.authorImage} alt={post.author} className="author-avatar" />
               <span className="author-name">{post.author}</span>
+              {post.readingTime > 0 && <span className="reading-time">{post.readingTime} min read</span>}
             </div>
             <Link to={`/blog/${post.id}`} className="read-more">Read More</Link>
           </div>
@@ -106,7 +127,7 @@ function Blog() {
           </button>
           
           <div className="page-numbers">
-            {[...Array(totalPages)].map((_, index) => (
+            {[...Array(pageCount)].map((_, index) => (
               <button
                 key={index + 1}
                 onClick={() => setCurrentPage(index + 1)}
@@ -118,8 +139,8 @@ function Blog() {
           </div>
           
           <button 
-            onClick={() => setCurrentPage(prev => Math.min(prev + 1, totalPages))}
-            disabled={currentPage === totalPages}
+            onClick={() => setCurrentPage(prev => prev + 1)}
+            disabled={currentPage >= pageCount}
             className="page-btn"
           >
             Next →
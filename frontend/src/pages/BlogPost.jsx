@@ -16,6 +16,12 @@ function BlogPost() {
     if (foundPost) {
       setPost(foundPost)
     }
+    fetch(`/api/posts/${id}`)
+      .then(res => res.ok ? res.json() : null)
+      .then(data => data && setPost(data))
+      .catch(err => console.log('Using mock data'))
+    // Fire-and-forget view count; the API only buffers it
+    navigator.sendBeacon?.(`/api/posts/${id}/view`)
   }, [id])
 
   if (!post) {
@@ -43,9 +49,14 @@ function BlogPost() {
             </div>
           </div>
           {post.image && <img src={post.image} alt={post.title} className="post-hero-image" />}
-          <div className="post-content">
-            <p>{post.content}</p>
-          </div>
+          {post.html ? (
+            // Rendered and escaped server-side when the post was saved
+            <div className="post-content" dangerouslySetInnerHTML={{ __html: post.html }} />
+          ) : (
+            <div className="post-content">
+              <p>{post.content}</p>
+            </div>
+          )}
         </article>
       </div>
     </div>
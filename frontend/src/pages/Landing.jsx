@@ -15,18 +15,7 @@ function Landing() {
   })
 
   useEffect(() => {
-    // Fetch latest posts for featured section
-    fetch('/api/posts')
-      .then(res => res.json())
-      .then(data => {
-        const featured = data.slice(-3).reverse()
-        if (featured.length > 0) {
-          setFeaturedPosts(featured)
-        }
-      })
-      .catch(err => console.log('Using mock featured posts'))
-    
-    // Fetch landing page data
+    // Landing content and its featured posts come back in one response
     fetch('/api/landing')
       .then(res => {
         if (res.ok) {
@@ -38,6 +27,9 @@ function Landing() {
         if (data && data.hero) {
           setLandingData(data)
         }
+        if (data?.featured?.length > 0) {
+          setFeaturedPosts(data.featured)
+        }
       })
       .catch(err => {
         console.log('Using default landing data:', err)
@@ -61,7 +53,7 @@ function Landing() {
               <div key={post.id} className="featured-post">
                 <img src={post.image} alt={post.title} className="featured-image" />
                 <h3>{post.title}</h3>
-                <p>{post.content.substring(0, 120)}...</p>
+                <p>{post.excerpt ?? `${post.content.substring(0, 120)}...`}</p>
                 <div className="featured-author">
                   <img src={post.authorImage} alt={post.author} className="author-avatar" />
                   <span className="author-name">{post.author}</span>
@@ -16,5 +16,5 @@ cd ..
 
 echo "Setup complete!"
 echo "To run the application:"
-echo "1. Backend: cd backend && source venv/bin/activate && python main.py"
+echo "1. Backend: cd backend && source venv/bin/activate && alembic upgrade head && python main.py"
 echo "2. Frontend: cd frontend && npm run dev"
\ No newline at end of file